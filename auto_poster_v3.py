@@ -2,13 +2,14 @@ import asyncio
 import os
 import argparse
 import re
+import sys
 from playwright.async_api import async_playwright
 
 # === 설정 ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SESSION_FILE = os.path.join(BASE_DIR, "tistory_session.json")
 BLOG_NAME = "fakehuman"
-WRITE_URL = f"https://{BLOG_NAME}.tistory.com/manage/newpost/"
+BASE_URL = f"https://{BLOG_NAME}.tistory.com"
 
 # === V1에서 가져온 마크다운 파서 ===
 def inline_format(text: str) -> str:
@@ -54,7 +55,8 @@ def md_to_html(md: str) -> str:
     if in_ul: html.append("</ul>")
     return "\n".join(html)
 
-async def post_to_tistory(file_path):
+async def post_to_tistory(file_path, base_url=BASE_URL):
+    """발행 성공 시 True, 실패 시 (error_v3.png 스크린샷 저장 후) False"""
     print("=" * 50, flush=True)
     print("🚀 티스토리 자동 포스팅 V3 (TinyMCE Engine)", flush=True)
     print("=" * 50, flush=True)
@@ -76,11 +78,15 @@ async def post_to_tistory(file_path):
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(storage_state=SESSION_FILE)
+        # 가짜 서버(base_url 변경)는 세션 파일 없이도 동작, 실제 티스토리는 세션 파일 필수
+        storage_state = SESSION_FILE
+        if base_url != BASE_URL and not os.path.exists(SESSION_FILE):
+            storage_state = None
+        context = await browser.new_context(storage_state=storage_state)
         page = await context.new_page()
 
         try:
-            await page.goto(WRITE_URL)
+            await page.goto(f"{base_url}/manage/newpost/")
             print(f"➡️  글쓰기 페이지 접속: {page.url}", flush=True)
 
             # 제목 입력
@@ -131,15 +137,19 @@ async def post_to_tistory(file_path):
             # 완료 대기
             await page.wait_for_url("**/manage/posts**", timeout=15000)
             print("\n🎉 발행 완료!", flush=True)
+            return True
 
         except Exception as e:
             print(f"\n❌ 오류: {e}", flush=True)
             await page.screenshot(path="error_v3.png")
+            return False
         finally:
             await browser.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--file', required=True)
+    parser.add_argument('--base-url', default=BASE_URL, help='블로그 주소 (테스트 시 fake_tistory_server.py 주소)')
     args = parser.parse_args()
-    asyncio.run(post_to_tistory(args.file))
+    ok = asyncio.run(post_to_tistory(args.file, base_url=args.base_url))
+    sys.exit(0 if ok else 1)
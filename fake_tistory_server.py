@@ -0,0 +1,367 @@
+"""
+가짜 티스토리 서버 (오프라인 E2E 테스트 / 발행 성능 측정용)
+==============================================================
+실제 티스토리 대신 로컬에서 아래만 흉내냅니다:
+  - 메인 페이지 (로그인 상태 표시: a.link_myinfo)
+  - 글쓰기 페이지 (#post-title-inp, tinymce.activeEditor 셈, a.action 임시저장,
+    #category-btn/#category-list 카테고리, #tagText 태그,
+    완료 버튼 → 발행 팝업 #open20/#open15/#open0, #publish-btn → /manage/posts 로 이동)
+  - 에디터 첨부 업로드 (/manage/post/attach.json)
+  - Open API 글쓰기 (/apis/post/write), 카테고리 목록 + OAuth 토큰 발급
+모든 요청에 지연(latency + jitter)을, 저장 계열 요청에는 추가 지연(save-latency)을 넣을 수 있습니다.
+
+사용법:
+  python fake_tistory_server.py                                # http://127.0.0.1:8765
+  python fake_tistory_server.py --latency 0.1 --save-latency 0.5
+  python fake_tistory_server.py bench --target deploy -n 50 -c 4 --file "posts/글.md"
+  python fake_tistory_server.py bench --target playwright --pool -n 2000 -c 2   # 장시간 연속 발행 (자원 관리 확인)
+
+발행 스크립트를 가짜 서버로 돌리기:
+  python tistory_playwright.py --base-url http://127.0.0.1:8765 --yes --no-pull --file "posts/글.md"
+  python auto_poster_v3.py --base-url http://127.0.0.1:8765 --file "posts/글.md"
+  tistory_deploy.CONFIG["api_base"] = "http://127.0.0.1:8765"
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+DEFAULT_PORT = 8765
+CATEGORIES = ("IT", "투자", "일상")
+
+HOME_HTML = """<!doctype html><html><head><meta charset="utf-8"><title>TISTORY (fake)</title></head>
+<body><a class="link_myinfo" href="/manage">내 정보</a></body></html>"""
+
+POSTS_HTML = """<!doctype html><html><head><meta charset="utf-8"><title>글 관리 (fake)</title></head>
+<body><div class="sidebar_menu">블로그 관리센터</div><p>posts: {count}</p></body></html>"""
+
+# 실제 에디터에서 발행 스크립트가 건드리는 요소만 남긴 글쓰기 페이지
+EDITOR_HTML = """<!doctype html><html><head><meta charset="utf-8"><title>글쓰기 (fake)</title>
+<script>
+  const ed = {
+    _content: "",
+    setContent(html) { this._content = html; document.getElementById("editor-tistory").value = html; },
+    getContent() { return this._content; },
+    save() {}, fire() {},
+  };
+  window.tinymce = { activeEditor: ed, editors: [ed] };
+
+  const tags = [];
+  let category = "";
+
+  function addTag(ev) {
+    if (ev.key !== "Enter") return;
+    const inp = document.getElementById("tagText");
+    if (inp.value) tags.push(inp.value);
+    inp.value = "";
+  }
+
+  function pickCategory(el) {
+    category = el.textContent;
+    document.getElementById("category-list").style.display = "none";
+  }
+
+  async function save(draft) {
+    const open = document.querySelector("input[name=visibility]:checked");
+    const body = {
+      title: document.getElementById("post-title-inp").value,
+      content: tinymce.activeEditor.getContent(),
+      visibility: open ? open.value : "0",
+      tags: tags,
+      category: category,
+      draft: draft,
+    };
+    const resp = await fetch("/manage/post.json", {method: "POST", body: JSON.stringify(body)});
+    const data = await resp.json();
+    if (!draft) location.href = "/manage/posts/?postId=" + data.postId;
+  }
+</script></head>
+<body>
+  <textarea id="post-title-inp"></textarea>
+  <button id="category-btn" onclick="document.getElementById('category-list').style.display='block'">카테고리</button>
+  <div id="category-list" style="display:none">
+    <div onclick="pickCategory(this)">IT</div>
+    <div onclick="pickCategory(this)">투자</div>
+    <div onclick="pickCategory(this)">일상</div>
+  </div>
+  <textarea id="editor-tistory"></textarea>
+  <input id="tagText" onkeydown="addTag(event)">
+  <a class="action" href="#" onclick="save(true); return false;">임시저장</a>
+  <button class="btn btn-default" onclick="document.getElementById('publish-layer').style.display='block'">완료</button>
+  <div id="publish-layer" style="display:none">
+    <input type="radio" name="visibility" id="open20" value="20"><label for="open20">공개</label>
+    <input type="radio" name="visibility" id="open15" value="15"><label for="open15">보호</label>
+    <input type="radio" name="visibility" id="open0" value="0" checked><label for="open0">비공개</label>
+    <button id="publish-btn" onclick="save(false)">발행</button>
+  </div>
+</body></html>"""
+
+
+class FakeTistoryHandler(http.server.BaseHTTPRequestHandler):
+    server: "FakeTistoryServer"
+
+    def _delay(self, save: bool = False):
+        s = self.server
+        wait = s.latency + random.uniform(0, s.jitter) + (s.save_latency if save else 0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, obj, status: int = 200):
+        self._send(status, json.dumps(obj, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_GET(self):
+        self._delay()
+        path = urllib.parse.urlparse(self.path).path
+        if path == "/":
+            self._send(200, HOME_HTML)
+        elif path.startswith("/manage/newpost"):
+            self._send(200, EDITOR_HTML)
+        elif path.startswith("/manage/posts"):
+            self._send(200, POSTS_HTML.format(count=len(self.server.posts)))
+        elif path == "/manage":
+            self.send_response(302)
+            self.send_header("Location", "/manage/posts/")
+            self.end_headers()
+        elif path == "/apis/category/list":
+            self._json({"tistory": {"status": "200", "item": {"categories": [
+                {"id": str(i + 1), "name": name, "label": name} for i, name in enumerate(CATEGORIES)]}}})
+        elif path == "/_stats":
+            self._json(self.server.stats())
+        else:
+            self._send(404, "not found")
+
+    def do_POST(self):
+        path = urllib.parse.urlparse(self.path).path
+        self._delay(save=True)
+        body = self._read_body()
+
+        if path == "/manage/post.json":
+            data = json.loads(body or b"{}")
+            post_id = self.server.add_post(data.get("title", ""), data.get("content", ""),
+                                           data.get("visibility", "0"), draft=bool(data.get("draft")),
+                                           tags=data.get("tags", []), category=data.get("category", ""))
+            self._json({"postId": post_id})
+
+        elif path == "/manage/post/attach.json":
+            # multipart 파싱 없이 본문 해시로 파일 URL 생성 (같은 파일이면 같은 URL)
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            self.server.count("attach")
+            self._json({"url": f"{self.server.base_url}/attach/{digest}"})
+
+        elif path == "/apis/post/write":
+            form = {k: v[0] for k, v in urllib.parse.parse_qs(body.decode("utf-8")).items()}
+            post_id = self.server.add_post(form.get("title", ""), form.get("content", ""),
+                                           form.get("visibility", "0"), draft=False,
+                                           tags=[t for t in form.get("tag", "").split(",") if t],
+                                           category=form.get("category", ""))
+            self._json({"tistory": {"status": "200", "postId": str(post_id),
+                                    "url": f"{self.server.base_url}/{post_id}"}})
+
+        elif path == "/oauth/access_token":
+            self._send(200, "access_token=fake-token", "text/plain; charset=utf-8")
+
+        else:
+            self._send(404, "not found")
+
+    def log_message(self, format, *args):
+        pass  # 서버 로그 숨기기
+
+
+class FakeTistoryServer(http.server.ThreadingHTTPServer):
+    """가짜 티스토리 서버. start()로 백그라운드 스레드 실행, posts 에 받은 글이 쌓임"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 latency: float = 0.0, jitter: float = 0.0, save_latency: float = 0.0):
+        super().__init__((host, port), FakeTistoryHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.save_latency = save_latency
+        self.posts = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_post(self, title: str, content: str, visibility: str, draft: bool,
+                 tags: list = (), category: str = "") -> int:
+        with self._lock:
+            self.posts.append({"title": title, "content": content, "visibility": str(visibility),
+                               "tags": list(tags), "category": category, "draft": draft, "at": time.time()})
+            self.counters["draft" if draft else "publish"] = self.counters.get("draft" if draft else "publish", 0) + 1
+            return len(self.posts)
+
+    def count(self, key: str):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"posts": len(self.posts), **self.counters}
+
+    def start(self) -> "FakeTistoryServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# --- 벤치마크 ---
+
+def run_jobs(target: str, md_file: str, base_url: str, n: int, concurrency: int,
+             pool: bool = False) -> tuple:
+    """발행 n번 실행 → (건별 소요 시간(초) 목록 (실행 순서), 브라우저 자원 통계 또는 None)
+    pool=True 이면 (playwright 대상) 브라우저 하나를 BrowserPool 로 계속 재사용"""
+    import asyncio
+    import contextlib
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+
+    if target == "deploy":
+        import tistory_deploy
+        tistory_deploy.CONFIG["api_base"] = base_url
+        tistory_deploy.CONFIG["blog_name"] = "fake"
+        title, body, opts = tistory_deploy.parse_markdown(md_file)
+
+        def job():
+            t = time.perf_counter()
+            tistory_deploy.post_to_tistory("fake-token", title, body, opts)
+            return time.perf_counter() - t
+
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(lambda _: job(), range(n))), None
+
+    browser = None
+    if target == "playwright":
+        import tistory_playwright
+        tistory_playwright.CONFIG["base_url"] = base_url
+
+        async def one():
+            t = time.perf_counter()
+            result = await tistory_playwright.publish(md_file, preflight=False, pool=browser)
+            if not result["ok"]:
+                raise Exception(result["error"])
+            return time.perf_counter() - t
+    elif target == "v3":
+        import auto_poster_v3
+
+        async def one():
+            t = time.perf_counter()
+            if not await auto_poster_v3.post_to_tistory(md_file, base_url=base_url):
+                raise Exception("v3 발행 실패 (error_v3.png 참고)")
+            return time.perf_counter() - t
+    else:
+        raise ValueError(f"알 수 없는 대상: {target}")
+
+    async def all_jobs():
+        nonlocal browser
+        limit = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with limit:
+                return await one()
+
+        if pool and target == "playwright":
+            browser = tistory_playwright.BrowserPool(max_pages=concurrency)
+        try:
+            return await asyncio.gather(*(limited() for _ in range(n)))
+        finally:
+            if browser is not None:
+                await browser.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        durations = asyncio.run(all_jobs())
+    return durations, browser.stats() if browser is not None else None
+
+
+def cmd_bench(args):
+    server = FakeTistoryServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                               save_latency=args.save_latency).start()
+    try:
+        started = time.perf_counter()
+        durations, resources = run_jobs(args.target, args.file, server.base_url, args.n, args.concurrency,
+                                        pool=args.pool)
+        wall = time.perf_counter() - started
+        stats = server.stats()
+    finally:
+        server.stop()
+
+    def pct(p: float, values: list) -> float:
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+    # 처음/마지막 10% 구간의 p50 비교 → 오래 돌릴수록 느려지는지 (브라우저 누수 등)
+    tenth = max(1, len(durations) // 10)
+    first, last = pct(0.5, durations[:tenth]), pct(0.5, durations[-tenth:])
+
+    print(f"🎯 대상: {args.target}  (n={args.n}, 동시 {args.concurrency}, "
+          f"지연 {args.latency}s+{args.jitter}s, 저장 지연 {args.save_latency}s)")
+    print(f"⏱️  p50 {pct(0.5, durations):.3f}s  p95 {pct(0.95, durations):.3f}s  max {max(durations):.3f}s")
+    print(f"📈 추이: 처음 10% p50 {first:.3f}s → 마지막 10% p50 {last:.3f}s")
+    print(f"🚀 처리량 {args.n / wall:.2f} 건/s  (총 {wall:.2f}s)")
+    print(f"📬 서버 수신: {stats}")
+    if resources is not None:
+        print(f"🧠 브라우저 자원: {resources}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 티스토리 서버 (오프라인 테스트/벤치마크)")
+    parser.add_argument("command", nargs="?", default="serve", choices=("serve", "bench"))
+    parser.add_argument("--port",         type=int,   default=DEFAULT_PORT)
+    parser.add_argument("--latency",      type=float, default=0.0, help="모든 요청 기본 지연 (초)")
+    parser.add_argument("--jitter",       type=float, default=0.0, help="추가 랜덤 지연 최대값 (초)")
+    parser.add_argument("--save-latency", type=float, default=0.0, help="저장/업로드 요청 추가 지연 (초)")
+    parser.add_argument("--target",       default="deploy", choices=("deploy", "playwright", "v3"),
+                        help="bench 대상 발행 경로")
+    parser.add_argument("--file",         default=None, help="bench 에 쓸 마크다운 파일")
+    parser.add_argument("-n",             type=int, default=20, help="bench 발행 횟수")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="bench 동시 실행 수")
+    parser.add_argument("--pool",         action="store_true",
+                        help="playwright 대상: 브라우저 하나를 계속 재사용 (BrowserPool, 탭 수 = 동시 실행 수)")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        if not args.file:
+            files = sorted((Path(__file__).parent / "posts").glob("*.md"))
+            args.file = str(files[0])
+        cmd_bench(args)
+        return
+
+    server = FakeTistoryServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                               save_latency=args.save_latency)
+    print(f"🧪 가짜 티스토리 서버: {server.base_url}  (Ctrl+C 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+미리보기 / 정적 아카이브 빌드
+==============================
+posts/*.md 를 발행 때와 같은 변환기(parse_markdown)로 HTML 로 만들어 출력 폴더에 씁니다.
+이미지는 출력 폴더 images/ 로 복사해 상대 경로로 연결하므로 오프라인으로 열어볼 수 있습니다.
+
+증분 빌드:
+  출력 폴더의 .build.json 에 글마다 의존성(글 파일, 참조 이미지, 변환기 코드의 (mtime, 크기),
+  이 글의 발행 URL, [[링크]] 대상별로 찾은 URL)을 기록해두고, 바뀐 것이 있는 글만 다시 변환합니다.
+  링크 대상 글의 제목/aliases 가 바뀌거나 대상 글이 발행되면 그 글을 링크하는 페이지만 다시 만들어집니다.
+  아무것도 안 바뀐 재빌드는 stat 호출만 하고 끝납니다.
+
+사용법:
+  python tistory_build.py build                 # site/ 에 빌드
+  python tistory_build.py build --out archive   # 출력 폴더 지정
+  python tistory_build.py build --force         # 전체 재빌드
+  python tistory_build.py serve                 # 빌드 + http://127.0.0.1:8000 미리보기 (새로고침 시 증분 빌드)
+"""
+
+import argparse
+import contextlib
+import html
+import http.server
+import io
+import json
+import shutil
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+import tistory_playwright as tp
+
+REPO_ROOT = Path(__file__).parent
+POSTS_DIR = REPO_ROOT / "posts"
+DEFAULT_OUT = REPO_ROOT / "site"
+MANIFEST_NAME = ".build.json"
+
+# 이 파일들이 바뀌면 변환 결과가 달라질 수 있으므로 전체 재빌드
+CONVERTER_FILES = (Path(tp.__file__), Path(__file__))
+
+PAGE_HTML = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>{title}</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<style>body{{max-width:760px;margin:2em auto;padding:0 1em;font-family:sans-serif;line-height:1.7;}}</style>
+</head><body>
+<p><a href="index.html">← 목록</a>{published}</p>
+{body}
+</body></html>
+"""
+
+INDEX_HTML = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>글 목록</title>
+<style>body{{max-width:760px;margin:2em auto;padding:0 1em;font-family:sans-serif;line-height:1.7;}}</style>
+</head><body>
+<h1>글 목록</h1>
+<ul>
+{items}
+</ul>
+</body></html>
+"""
+
+
+def stat_sig(path: Path):
+    """의존성 비교용 서명 (mtime_ns, 크기). 파일이 없으면 None"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def converter_sig() -> list:
+    return [stat_sig(f) for f in CONVERTER_FILES]
+
+
+def page_name(md: Path) -> str:
+    return md.stem + ".html"
+
+
+class LinkState:
+    """빌드 한 번 동안 공유하는 발행 기록 / 링크 인덱스 (링크 인덱스는 [[링크]] 있는 글이 있을 때만 읽음)"""
+
+    def __init__(self):
+        self.ledger = tp.load_ledger()
+        self._lookup = None
+
+    def published_url(self, md_key: str):
+        entry = self.ledger.get(md_key)
+        return entry["url"] if entry else None
+
+    def resolve(self, target: str):
+        if self._lookup is None:
+            self._lookup = tp.load_link_index()
+        return self.published_url(self._lookup.get(target.strip().lower(), ""))
+
+    def resolve_all(self, targets) -> dict:
+        return {t: self.resolve(t) for t in targets}
+
+
+def wikilink_targets(source: str) -> list:
+    """본문의 [[링크]] 대상 (소문자, 중복 제거). 이미지 ![[...]] 는 WIKILINK_RE 가 제외"""
+    return list(dict.fromkeys(m.group(1).strip().lower() for m in tp.WIKILINK_RE.finditer(source)))
+
+
+def is_fresh(entry: dict, links: LinkState) -> bool:
+    """기록된 의존성이 모두 그대로인지 (파일은 stat 만, 링크는 딕셔너리 조회만)"""
+    if stat_sig(REPO_ROOT / entry["src"]) != entry["sig"]:
+        return False
+    for rel, sig in entry["images"].items():
+        if stat_sig(REPO_ROOT / rel) != sig:
+            return False
+    # 없던 이미지가 새로 생겼으면 다시 빌드
+    if any(tp.find_image(name) is not None for name in entry["missing"]):
+        return False
+    if links.published_url(entry["src"]) != entry["url"]:
+        return False
+    if entry["links"] and links.resolve_all(entry["links"]) != entry["links"]:
+        return False
+    return True
+
+
+def build_page(md: Path, out: Path, links: LinkState) -> dict:
+    """글 하나 변환 → 출력 파일 쓰기, 의존성 기록 반환"""
+    images = {}
+    missing = []
+
+    def local_image(name: str):
+        path = tp.find_image(name)
+        if path is None:
+            missing.append(name)
+            return None
+        rel = path.resolve().relative_to(REPO_ROOT.resolve()).as_posix()
+        images[rel] = stat_sig(path)
+        dest = out / "images" / path.name
+        if stat_sig(dest) is None or dest.stat().st_mtime_ns < path.stat().st_mtime_ns:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, dest)
+        return "images/" + urllib.parse.quote(path.name)
+
+    sig = stat_sig(md)
+    source = md.read_text(encoding="utf-8")
+    with contextlib.redirect_stdout(io.StringIO()):
+        title, body, _ = tp.parse_markdown(str(md), image_url=local_image, wikilink=links.resolve)
+
+    src = md.resolve().relative_to(REPO_ROOT.resolve()).as_posix()
+    url = links.published_url(src)
+    published = ""
+    if url:
+        published = f' · <a href="{html.escape(url)}">티스토리에서 보기</a>'
+    (out / page_name(md)).write_text(
+        PAGE_HTML.format(title=html.escape(title), published=published, body=body), encoding="utf-8")
+
+    return {
+        "src":     src,
+        "sig":     sig,
+        "images":  images,
+        "missing": missing,
+        "url":     url,
+        "links":   links.resolve_all(wikilink_targets(source)),
+        "title":   title,
+    }
+
+
+def write_index(out: Path, pages: dict):
+    items = []
+    for name, entry in sorted(pages.items(), reverse=True):
+        items.append(f'<li><a href="{urllib.parse.quote(name)}">{html.escape(entry["title"])}</a></li>')
+    (out / "index.html").write_text(INDEX_HTML.format(items="\n".join(items)), encoding="utf-8")
+
+
+def build(out: Path = DEFAULT_OUT, force: bool = False, quiet: bool = False) -> dict:
+    """증분 빌드 → {"built": [...], "removed": [...], "skipped": n, "seconds": ...}"""
+    started = time.perf_counter()
+    out.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists() and not force:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    converter = converter_sig()
+    if manifest.get("converter") != converter:
+        manifest = {}
+    pages = manifest.get("pages", {})
+
+    links = LinkState()
+    built, removed = [], []
+    current = {}
+    for md in sorted(POSTS_DIR.glob("*.md")):
+        name = page_name(md)
+        current[name] = md
+        entry = pages.get(name)
+        if entry is not None and is_fresh(entry, links):
+            continue
+        pages[name] = build_page(md, out, links)
+        built.append(name)
+
+    for name in set(pages) - set(current):
+        del pages[name]
+        (out / name).unlink(missing_ok=True)
+        removed.append(name)
+
+    if built or removed or not (out / "index.html").exists():
+        write_index(out, pages)
+        manifest_path.write_text(json.dumps({"converter": converter, "pages": pages},
+                                            ensure_ascii=False, indent=1), encoding="utf-8")
+
+    result = {"built": built, "removed": removed, "skipped": len(current) - len(built),
+              "seconds": round(time.perf_counter() - started, 4)}
+    if not quiet:
+        print(f"🏗️  빌드: {len(built)}개 변환, {len(removed)}개 삭제, {result['skipped']}개 그대로 "
+              f"({result['seconds'] * 1000:.1f} ms) → {out}")
+        for name in built:
+            print(f"  📝 {name}")
+            for img in pages[name]["missing"]:
+                print(f"     ⚠️  이미지 없음: {img}")
+    return result
+
+
+def serve(out: Path, port: int):
+    """미리보기 서버: 페이지 요청마다 증분 빌드 (안 바뀌었으면 ms 단위로 끝남)"""
+    lock = threading.Lock()
+
+    class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(out), **kwargs)
+
+        def do_GET(self):
+            path = urllib.parse.urlparse(self.path).path
+            if path == "/" or path.endswith(".html"):
+                with lock:
+                    result = build(out, quiet=True)
+                if result["built"] or result["removed"]:
+                    print(f"🔄 재빌드: {', '.join(result['built'] + result['removed'])}")
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass  # 서버 로그 숨기기
+
+    build(out)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), PreviewHandler)
+    print(f"👀 미리보기: http://127.0.0.1:{port}/  (Ctrl+C 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    tp.force_utf8_stdio()
+    parser = argparse.ArgumentParser(description="미리보기 / 정적 아카이브 빌드")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="posts/ → HTML (증분)")
+    p.add_argument("--out",   default=str(DEFAULT_OUT), help="출력 폴더")
+    p.add_argument("--force", action="store_true", help="전체 재빌드")
+
+    p = sub.add_parser("serve", help="빌드 + 로컬 미리보기 서버")
+    p.add_argument("--out",  default=str(DEFAULT_OUT), help="출력 폴더")
+    p.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build(Path(args.out), force=args.force)
+    else:
+        serve(Path(args.out), args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ import threading
 import re
 from pathlib import Path
 
+from tistory_playwright import VISIBILITY_ALIASES, post_meta, split_front_matter
+
 # =============================================
 # ✏️  여기만 채워주세요
 # =============================================
@@ -24,6 +26,7 @@ CONFIG = {
     "client_secret": "YOUR_SECRET_KEY",   # 티스토리 Secret Key
     "blog_name":     "YOUR_BLOG_NAME",    # 블로그 주소 앞부분 (예: myblog.tistory.com → myblog)
     "redirect_uri":  "http://localhost:8080/callback",
+    "api_base":      "https://www.tistory.com",   # 테스트 시 가짜 서버 주소 (fake_tistory_server.py)
 }
 
 # 발행할 마크다운 파일 경로 (같은 폴더의 파일명)
@@ -57,7 +60,7 @@ class CallbackHandler(http.server.BaseHTTPRequestHandler):
 def get_access_token():
     """OAuth 인증을 통해 Access Token 발급"""
     auth_url = (
-        "https://www.tistory.com/oauth/authorize?"
+        f"{CONFIG['api_base']}/oauth/authorize?"
         + urllib.parse.urlencode({
             "client_id":     CONFIG["client_id"],
             "redirect_uri":  CONFIG["redirect_uri"],
@@ -79,7 +82,7 @@ def get_access_token():
         raise Exception("❌ 인증 코드를 받지 못했습니다. 다시 시도해주세요.")
 
     # Access Token 요청
-    token_url = "https://www.tistory.com/oauth/access_token"
+    token_url = f"{CONFIG['api_base']}/oauth/access_token"
     data = urllib.parse.urlencode({
         "client_id":     CONFIG["client_id"],
         "client_secret": CONFIG["client_secret"],
@@ -103,12 +106,13 @@ def get_access_token():
 # --- 마크다운 파싱 ---
 
 def parse_markdown(filepath: str):
-    """마크다운 파일에서 제목과 본문을 추출"""
-    content = Path(filepath).read_text(encoding="utf-8")
+    """마크다운 파일에서 제목, 본문, 발행 옵션(front matter 태그/카테고리/공개 설정)을 추출"""
+    meta, content = split_front_matter(Path(filepath).read_text(encoding="utf-8"))
+    opts = post_meta(meta)
 
-    # 첫 번째 H1을 제목으로 사용
-    title_match = re.search(r"^#\s+(.+)", content, re.MULTILINE)
-    title = title_match.group(1).strip() if title_match else Path(filepath).stem
+    # front matter title → 첫 번째 H1 → 파일명
+    title_match = None if opts["title"] else re.search(r"^#\s+(.+)", content, re.MULTILINE)
+    title = opts["title"] or (title_match.group(1).strip() if title_match else Path(filepath).stem)
 
     # 이미지 링크([[...]]) 제거 (티스토리 업로드 전 처리)
     body = re.sub(r"!\[\[.*?\]\]", "[이미지]", content)
@@ -116,7 +120,7 @@ def parse_markdown(filepath: str):
     # 마크다운 → HTML 간단 변환
     body = md_to_html(body)
 
-    return title, body
+    return title, body, opts
 
 
 def md_to_html(md: str) -> str:
@@ -173,19 +177,46 @@ def md_to_html(md: str) -> str:
 
 # --- 티스토리 API 글 발행 ---
 
-def post_to_tistory(access_token: str, title: str, content: str):
-    """티스토리에 글 발행"""
-    api_url = "https://www.tistory.com/apis/post/write"
+# front matter visibility → API visibility 값
+API_VISIBILITY = {"private": "0", "protected": "1", "public": "3"}
 
-    data = urllib.parse.urlencode({
+
+def resolve_category(access_token: str, category: str) -> str:
+    """카테고리 이름 → API 카테고리 id (숫자면 그대로)"""
+    if category.isdigit():
+        return category
+    query = urllib.parse.urlencode({
+        "access_token": access_token,
+        "output":       "json",
+        "blogName":     CONFIG["blog_name"],
+    })
+    with urllib.request.urlopen(f"{CONFIG['api_base']}/apis/category/list?{query}") as resp:
+        result = json.loads(resp.read().decode("utf-8"))
+    for c in result.get("tistory", {}).get("item", {}).get("categories", []):
+        if category in (c.get("name"), c.get("label")):
+            return str(c["id"])
+    raise Exception(f"❌ 카테고리 없음: {category}")
+
+
+def post_to_tistory(access_token: str, title: str, content: str, opts: dict = None):
+    """티스토리에 글 발행 (opts: parse_markdown 의 발행 옵션 - 태그/카테고리/공개 설정)"""
+    api_url = f"{CONFIG['api_base']}/apis/post/write"
+    opts = opts or {}
+
+    params = {
         "access_token": access_token,
         "output":       "json",
         "blogName":     CONFIG["blog_name"],
         "title":        title,
         "content":      content,
-        "visibility":   "3",   # 0: 비공개, 3: 발행
+        "visibility":   API_VISIBILITY[opts.get("visibility") or "public"],   # 0: 비공개, 1: 보호, 3: 발행
         "acceptComment": "1",
-    }).encode("utf-8")
+    }
+    if opts.get("tags"):
+        params["tag"] = ",".join(opts["tags"])
+    if opts.get("category"):
+        params["category"] = resolve_category(access_token, opts["category"])
+    data = urllib.parse.urlencode(params).encode("utf-8")
 
     req = urllib.request.Request(api_url, data=data, method="POST")
     with urllib.request.urlopen(req) as resp:
@@ -221,7 +252,10 @@ def main():
         return
 
     print(f"\n📄 파일: {MD_FILE}")
-    title, body = parse_markdown(str(md_path))
+    title, body, opts = parse_markdown(str(md_path))
+    if opts["visibility"] and opts["visibility"] not in API_VISIBILITY:
+        print(f"\n❌ 알 수 없는 visibility: {opts['visibility']} (가능: {', '.join(VISIBILITY_ALIASES)})")
+        return
     print(f"📝 제목: {title}")
     print(f"📏 본문 길이: {len(body)} 글자")
 
@@ -232,7 +266,7 @@ def main():
 
     try:
         token = get_access_token()
-        post_to_tistory(token, title, body)
+        post_to_tistory(token, title, body, opts)
     except Exception as e:
         print(f"\n{e}")
 
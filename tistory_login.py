@@ -1,11 +1,191 @@
 import asyncio
 import os
+import re
+import time
+from typing import Optional
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright
 import getpass
 
 # === 설정 ===
 SESSION_FILE = "tistory_session.json"
 TISTORY_LOGIN_URL = "https://fakehuman.tistory.com/manage"
+LOGIN_TIMEOUT = 120        # 로그인 버튼 클릭 후 관리자 페이지까지 최대 대기 (초)
+TWO_FACTOR_TIMEOUT = 180   # 카카오톡 2차 인증 승인 대기 (초)
+MAX_STATE_REPEAT = 3       # 같은 중간 화면이 이 횟수 넘게 반복되면 실패 처리
+ACTION_TIMEOUT = 10        # 버튼 클릭 후 화면이 바뀌길 기다리는 최대 시간 (초, 보통은 바뀌는 즉시 진행)
+
+
+# === 로그인 상태 머신 ===
+# 로그인 버튼 클릭 이후 나올 수 있는 화면들. 앞에 있을수록 우선 (동시에 감지되면 앞의 것 선택)
+#   manage      : 티스토리 관리자 페이지 (완료)
+#   two_factor  : 카카오 2차 인증 (카카오톡 승인 대기)
+#   keep_login  : 로그인 상태 유지 / 계정 선택
+#   continue    : 계속하기
+#   consent     : 동의 / Accept
+STATES = ("manage", "two_factor", "keep_login", "continue", "consent")
+
+
+def is_manage_url(url: str) -> bool:
+    u = urlparse(url)
+    return u.netloc.endswith(".tistory.com") and u.path.startswith("/manage")
+
+
+def is_two_factor_url(url: str) -> bool:
+    return "risk/verify" in url or "two-step" in url
+
+
+def state_waiters(page) -> dict:
+    """상태별 감지 코루틴 (각각 해당 화면이 뜰 때까지 대기, 폴링 없음)"""
+    def visible(locator):
+        return locator.first.wait_for(state="visible", timeout=0)
+
+    return {
+        "manage": [
+            page.wait_for_url(is_manage_url, timeout=0, wait_until="commit"),
+            visible(page.locator(".sidebar_menu")),
+            visible(page.get_by_text("블로그 관리센터")),
+        ],
+        "two_factor": [
+            page.wait_for_url(is_two_factor_url, timeout=0, wait_until="commit"),
+            visible(page.get_by_text("이중잠금")),
+        ],
+        "keep_login": [
+            visible(page.get_by_text("로그인 상태 유지")),
+            visible(page.get_by_text("이 브라우저에서")),
+        ],
+        "continue": [visible(page.get_by_text("계속하기"))],
+        "consent": [visible(page.locator("button[type='submit']").filter(has_text=re.compile("동의|Accept")))],
+    }
+
+
+async def wait_for_state(page, timeout: float, exclude: Optional[str] = None):
+    """알려진 화면 중 가장 먼저 나타나는 것을 반환 (timeout 초 안에 없으면 None)
+    exclude 로 지정한 화면은 감지하지 않음 (지금 화면에서 다른 화면으로 바뀌는 순간을 기다릴 때)"""
+    tasks = {}
+    for state, waiters in state_waiters(page).items():
+        if state == exclude:
+            for w in waiters:
+                w.close()   # 만들기만 한 코루틴 정리 (경고 방지)
+            continue
+        for w in waiters:
+            tasks[asyncio.ensure_future(w)] = state
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        # 감지 직후 다른 화면도 떠 있을 수 있으니 잠깐 더 모아서 우선순위로 선택
+        if done:
+            more, _ = await asyncio.wait(tasks, timeout=0.05, return_when=asyncio.ALL_COMPLETED)
+            done |= more
+        hits = {tasks[t] for t in done if not t.cancelled() and t.exception() is None}
+        for state in STATES:
+            if state in hits:
+                return state
+        return None
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def click_if_visible(page, selector: str) -> bool:
+    try:
+        loc = page.locator(selector).first
+        if await loc.is_visible():
+            await loc.click(timeout=2000)
+            return True
+    except Exception:
+        pass
+    return False
+
+
+async def act_and_wait(page, state: str, action):
+    """버튼 클릭 후 다음 화면으로 넘어가는 순간까지만 대기 (고정 sleep 없음)
+    페이지 이동과 (같은 페이지 안에서) 다른 화면이 뜨는 것 중 먼저 오는 쪽에서 바로 반환
+    아무것도 클릭하지 못했으면 기다리지 않고 반환"""
+    if not await action():
+        return
+    navigated = asyncio.ensure_future(
+        page.wait_for_event("framenavigated", predicate=lambda frame: frame == page.main_frame, timeout=0))
+    changed = asyncio.ensure_future(wait_for_state(page, ACTION_TIMEOUT, exclude=state))
+    try:
+        await asyncio.wait({navigated, changed}, timeout=ACTION_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in (navigated, changed):
+            t.cancel()
+        await asyncio.gather(navigated, changed, return_exceptions=True)
+
+
+async def drive_login(page, user_id: str, started: float) -> bool:
+    """로그인 버튼 클릭 이후 → 관리자 페이지까지 화면 전환에 반응하며 진행
+    전환마다 경과 시간을 출력하고, 관리자 페이지에 도달하면 True"""
+    deadline = started + LOGIN_TIMEOUT
+    seen = {}
+    transitions = []
+
+    def log(state: str, note: str = ""):
+        elapsed = time.perf_counter() - started
+        transitions.append((state, elapsed))
+        print(f"⏱️  [{elapsed:6.2f}s] {state} {note}".rstrip())
+
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            print("❌ 타임아웃")
+            return False
+
+        state = await wait_for_state(page, remaining)
+        if state is None:
+            print("❌ 타임아웃")
+            return False
+
+        seen[state] = seen.get(state, 0) + 1
+        if state != "manage" and seen[state] > MAX_STATE_REPEAT:
+            print(f"❌ '{state}' 화면에서 더 진행되지 않습니다.")
+            return False
+
+        if state == "manage":
+            log(state, "✅ 관리자 페이지 접속 성공!")
+            summary = " → ".join(f"{s}({t:.1f}s)" for s, t in transitions)
+            print(f"📊 로그인 경로: {summary}")
+            return True
+
+        elif state == "two_factor":
+            log(state)
+            print("\n" + "!"*50)
+            print("📱 [2차 인증 필요] 카카오톡으로 발송된 인증을 승인해주세요!")
+            print("   승인하면 자동으로 다음 단계로 넘어갑니다. (엔터 입력 불필요)")
+            print("!"*50 + "\n")
+            # 인증 화면을 벗어날 때까지 대기 (승인 즉시 진행)
+            deadline = max(deadline, time.perf_counter() + TWO_FACTOR_TIMEOUT)
+            try:
+                await page.wait_for_url(lambda url: not is_two_factor_url(url),
+                                        timeout=TWO_FACTOR_TIMEOUT * 1000, wait_until="commit")
+                await page.get_by_text("이중잠금").first.wait_for(state="hidden", timeout=TWO_FACTOR_TIMEOUT * 1000)
+            except Exception:
+                print("❌ 2차 인증 대기 시간 초과")
+                return False
+            continue
+
+        elif state == "keep_login":
+            log(state, "👉 '로그인 상태 유지' 화면 감지! 버튼 클릭 시도...")
+
+            async def keep_login() -> bool:
+                # 계정 선택 화면이면 내 계정 클릭
+                if await click_if_visible(page, f"text={user_id}"):
+                    print(f"👉 계정 선택 화면: {user_id} 클릭")
+                    return True
+                return (await click_if_visible(page, "button[type='submit']")
+                        or await click_if_visible(page, ".btn_confirm"))
+            await act_and_wait(page, state, keep_login)
+
+        elif state == "continue":
+            log(state, "👉 '계속하기' 버튼 클릭")
+            await act_and_wait(page, state, lambda: click_if_visible(page, "text=계속하기"))
+
+        elif state == "consent":
+            log(state, "👉 동의 버튼 클릭")
+            await act_and_wait(page, state, lambda: click_if_visible(page, "button[type='submit']"))
+
 
 async def run():
     print("=" * 50)
@@ -55,95 +235,20 @@ async def run():
             await page.fill("#password--2", user_pw)
             print("🔑 계정 정보 입력 완료")
 
-            # 로그인 버튼 클릭
-            await page.click("button.btn_g.highlight.submit")
-            
-            # 4. 로그인 결과 대기 (2차 인증 or 성공)
-            print("⏳ 로그인 처리 중...")
-            
-            # 2~3초 대기 후 URL 확인
-            await page.wait_for_timeout(3000)
-            
-            # 2차 인증 페이지 감지 (URL에 verify가 있거나, 특정 텍스트가 보이면)
-            # 대기 시간을 좀 더 넉넉히 줌
-            await page.wait_for_timeout(5000)
-            
-            if "risk/verify" in page.url or "two-step" in page.url or await page.locator("text=이중잠금").is_visible():
-                print("\n" + "!"*50)
-                print("📱 [2차 인증 필요] 카카오톡으로 발송된 인증을 확인해주세요!")
-                print("   인증을 완료하신 후, 이곳 터미널에서 [Enter] 키를 눌러주세요.")
-                print("!"*50 + "\n")
-                input(">> 인증 완료 후 엔터 입력: ")
-                
-                # 인증 후 대기
-                await page.wait_for_timeout(5000)
-
-            # 티스토리 관리자 페이지 진입 확인 (중간에 버튼이 있으면 클릭 시도)
+            # 로그인 버튼 클릭 → 폼을 벗어날 때까지 (실패 시 폼에 머무름)
+            started = time.perf_counter()
             try:
-                print("⏳ 관리자 페이지 진입 대기 중... (중간 화면이 뜨면 처리를 시도합니다)")
-                
-                # 60초 동안 반복 체크
-                for i in range(12): # 5초 * 12번 = 60초
-                    # 멈춰있는 화면의 텍스트 확인
-                    body_text = await page.inner_text("body")
-
-                    # 성공 조건: 사이드바가 보이거나, '블로그 관리센터' 텍스트가 있거나, URL이 manage로 끝날 때
-                    if await page.locator(".sidebar_menu").is_visible() or "블로그 관리센터" in body_text or "/manage" in page.url:
-                        print("✅ 관리자 페이지 접속 성공! (인증 완료)")
-                        break
-                    
-                    # '계속하기'나 '확인' 버튼이 보이면 클릭
-                    
-                    # '계속하기'나 '확인' 버튼이 보이면 클릭
-                    if "로그인 상태 유지" in body_text or "이 브라우저에서" in body_text:
-                        print("👉 '로그인 상태 유지' 화면 감지! 버튼 클릭 시도...")
-                        # 1. 'user_id' (이메일) 텍스트가 있으면 클릭 (계정 선택 화면일 경우)
-                        try:
-                            if user_id in body_text:
-                                print(f"👉 계정 선택 화면: {user_id} 클릭")
-                                await page.click(f"text={user_id}")
-                                await page.wait_for_timeout(2000)
-                        except:
-                            pass
-
-                        # 2. 일반적인 버튼 클릭
-                        try:
-                            # 카카오 노란 버튼 (.btn_g) 또는 submit
-                            if await page.locator("button[type='submit']").is_visible():
-                                await page.click("button[type='submit']")
-                            elif await page.locator(".btn_confirm").is_visible():
-                                await page.click(".btn_confirm")
-                        except:
-                            pass
-
-                    # '계속하기' 버튼이 보이면 클릭 (이게 핵심!)
-                    if "계속하기" in body_text:
-                        print("👉 '계속하기' 버튼 감지! 클릭 시도...")
-                        try:
-                            await page.click("text=계속하기")
-                            await page.wait_for_timeout(2000)
-                        except:
-                            pass
-                            
-                    if "동의" in body_text or "Accept" in body_text:
-                         try:
-                            await page.click("button[type='submit']", timeout=2000)
-                         except:
-                            pass
-
-                    await page.wait_for_timeout(5000)
-                            
-                    if "동의" in body_text or "Accept" in body_text:
-                         try:
-                            await page.click("button[type='submit']", timeout=2000)
-                         except:
-                            pass
-
-                    await page.wait_for_timeout(5000)
-                else:
-                    raise Exception("타임아웃")
-
-            except Exception as e:
+                async with page.expect_navigation(timeout=15000):
+                    await page.click("button.btn_g.highlight.submit")
+            except Exception:
+                print("❌ 로그인 폼에서 넘어가지 않습니다 (아이디/비밀번호 확인)")
+                text = await page.inner_text("body")
+                print(f"\n📄 [화면 내용]\n{text[:500]}\n...")
+                return
+
+            # 4. 로그인 결과 대기 (2차 인증 / 중간 화면 / 성공) - 고정 sleep 없이 화면 변화에 반응
+            print("⏳ 로그인 처리 중...")
+            if not await drive_login(page, user_id, started):
                 print(f"❌ 로그인 실패. 현재 URL: {page.url}")
                 # 화면에 뭐가 떴는지 텍스트로 덤프
                 text = await page.inner_text("body")
@@ -12,33 +12,39 @@
   playwright install chromium
 
 사용법:
-  python tistory_playwright.py                          # 최신 파일 자동 발행
+  python tistory_playwright.py                          # 최신 파일 자동 발행 (= publish)
   python tistory_playwright.py --file "내글.md"         # 파일 지정
   python tistory_playwright.py --draft                  # 임시저장 (발행 안함)
   python tistory_playwright.py --no-pull                # git pull 생략
+  python tistory_playwright.py render --file "내글.md"  # HTML 변환만 (브라우저 X)
+  python tistory_playwright.py preflight --file "내글.md"  # 이미지 push 여부만 점검
+  python tistory_playwright.py check-session            # 세션 유효성만 확인
+
+playwright는 브라우저가 필요한 순간(publish, check-session)에만 import 되므로
+render 나 라이브러리 import(`from tistory_playwright import parse_markdown`)는 가볍고 부작용 없음.
 """
 
-import asyncio
 import argparse
+import contextlib
+import json
+import os
 import re
 import sys
-import io
+import hashlib
 import urllib.parse
 import subprocess
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
-# 터미널 인코딩 강제 UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
-sys.stdin  = io.TextIOWrapper(sys.stdin.buffer,  encoding="utf-8")
 
-try:
-    from playwright.async_api import async_playwright
-except ImportError:
-    print("❌ playwright 미설치. 아래 명령어로 설치해주세요:")
-    print("   pip install playwright && playwright install chromium")
-    exit(1)
+def load_playwright():
+    """playwright 지연 import (브라우저가 필요한 경로에서만 호출)"""
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        raise ImportError("❌ playwright 미설치. 설치: pip install playwright && playwright install chromium")
+    return async_playwright
 
 # =============================================
 # ✏️  설정값 채워주세요
@@ -48,19 +54,64 @@ CONFIG = {
     "github_user":   "k-ubella",     # GitHub 사용자명
     "github_repo":   "blog-posts",   # 레포 이름 (Public)
     "github_branch": "main",         # 브랜치
+    "github_remote": "origin",       # 이미지 push 여부 점검용 원격 이름
+    "base_url":      None,           # 테스트용 주소 덮어쓰기 (예: fake_tistory_server.py → http://127.0.0.1:8765)
 }
 # =============================================
 
 SESSION_FILE = Path(__file__).parent / "tistory_session.json"
 
+# 발행 팝업의 공개 설정 라디오 버튼 id
+VISIBILITY_INPUTS = {
+    "public":    "open20",   # 공개
+    "protected": "open15",   # 보호
+    "private":   "open0",    # 비공개
+}
 
-def github_raw_url(img_name: str) -> Optional[str]:
-    """이미지 파일명 → GitHub raw URL 변환 (레포 내 경로 자동 탐색)"""
-    repo_root = Path(__file__).parent
-    user   = CONFIG["github_user"]
-    repo   = CONFIG["github_repo"]
-    branch = CONFIG["github_branch"]
+# 글쓰기 화면의 카테고리/태그 입력 요소
+EDITOR_SELECTORS = {
+    "category_button": "#category-btn",
+    "category_list":   "#category-list",
+    "tag_input":       "#tagText",
+}
+
+# 이미지 방식: GitHub raw URL / 티스토리 에디터 첨부 업로드
+IMAGE_MODES = ("github", "upload")
+IMAGE_MAP_FILE = Path(__file__).parent / "tistory_images.json"   # 업로드 이미지 해시 → CDN URL
+IMAGE_UPLOAD_CONCURRENCY = 4
+
+# 오래 켜두는 브라우저 자원 관리 (BrowserPool)
+BROWSER_MAX_PAGES = 2     # 동시에 여는 발행 탭 수
+BROWSER_MAX_JOBS = 50     # 컨텍스트 하나로 처리할 발행 수 (넘으면 컨텍스트 재생성)
+BROWSER_MAX_MB = 700      # 브라우저 전체 프로세스 메모리 상한 MB (넘으면 브라우저 재시작)
+
+LEDGER_FILE = Path(__file__).parent / "tistory_ledger.json"      # 발행 기록 (글 → URL)
+LINK_INDEX_FILE = Path(__file__).parent / "tistory_links.json"   # [[글]] 링크 인덱스 (글 → 이름들)
+
+# 코드 블록 스타일 (pygments 스타일은 어두운 배경용)
+CODE_PRE_STYLE = "background:#1e2d3d;color:#7dd3fc;padding:1em;border-radius:6px;overflow-x:auto;font-family:monospace;font-size:14px;line-height:1.6;"
+CODE_THEME = "monokai"
+
+
+def blog_url(path: str = "") -> str:
+    base = CONFIG["base_url"] or f"https://{CONFIG['blog_name']}.tistory.com"
+    return base.rstrip("/") + path
+
+
+def home_url() -> str:
+    return CONFIG["base_url"] or "https://www.tistory.com"
 
+
+def session_state() -> Optional[str]:
+    """Playwright storage_state 인자 (가짜 서버로 돌릴 때는 세션 파일 없어도 됨)"""
+    if SESSION_FILE.exists() or not CONFIG["base_url"]:
+        return str(SESSION_FILE)
+    return None
+
+
+def find_image(img_name: str) -> Optional[Path]:
+    """이미지 파일명 → 레포 내 실제 경로 (첨부파일 폴더 → posts → 루트 순으로 탐색)"""
+    repo_root = Path(__file__).parent
     candidates = [
         repo_root / "00_첨부파일" / img_name,
         repo_root / "posts" / img_name,
@@ -69,33 +120,227 @@ def github_raw_url(img_name: str) -> Optional[str]:
     ]
     for c in candidates:
         if c.exists():
-            rel = c.resolve().relative_to(repo_root.resolve())
-            encoded = "/".join(urllib.parse.quote(part) for part in rel.parts)
-            return f"https://raw.githubusercontent.com/{user}/{repo}/{branch}/{encoded}"
+            return c
+    return None
+
+
+def github_raw_url(img_name: str) -> Optional[str]:
+    """이미지 파일명 → GitHub raw URL 변환 (레포 내 경로 자동 탐색)"""
+    repo_root = Path(__file__).parent
+    user   = CONFIG["github_user"]
+    repo   = CONFIG["github_repo"]
+    branch = CONFIG["github_branch"]
+
+    c = find_image(img_name)
+    if c is not None:
+        rel = c.resolve().relative_to(repo_root.resolve())
+        encoded = "/".join(urllib.parse.quote(part) for part in rel.parts)
+        return f"https://raw.githubusercontent.com/{user}/{repo}/{branch}/{encoded}"
 
     print(f"  ⚠️  이미지 파일 없음: {img_name}")
     return None
 
 
+OBSIDIAN_IMAGE_RE = re.compile(r"!\[\[(.+?)\]\]")
+MD_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+
+
+def referenced_images(content: str) -> list:
+    """본문이 참조하는 로컬 이미지 파일명 목록 (중복 제거, 등장 순서 유지, http 이미지 제외)"""
+    names = [m.group(1).split("|")[0].strip() for m in OBSIDIAN_IMAGE_RE.finditer(content)]
+    names += [Path(m.group(2)).name for m in MD_IMAGE_RE.finditer(content) if not m.group(2).startswith("http")]
+    return list(dict.fromkeys(names))
+
+
+def preflight_images(content: str) -> list:
+    """발행 전 이미지 점검: raw URL이 실제로 열릴지 원격 추적 브랜치 기준으로 확인
+    git ls-tree (원격 blob) / git hash-object (로컬 blob) 를 각각 한 번씩만 호출
+    반환: [(이미지명, 문제 설명), ...] (빈 리스트면 통과)"""
+    repo_root = Path(__file__).parent.resolve()
+    ref = f"{CONFIG['github_remote']}/{CONFIG['github_branch']}"
+
+    problems = []
+    local = {}   # 레포 상대경로(posix) → 이미지명
+    for name in referenced_images(content):
+        path = find_image(name)
+        if path is None:
+            problems.append((name, "로컬에 파일 없음"))
+        else:
+            local[path.resolve().relative_to(repo_root).as_posix()] = name
+    if not local:
+        return problems
+
+    rels = list(local)
+    tree = subprocess.run(["git", "ls-tree", "-r", "-z", ref, "--", *rels],
+                          cwd=str(repo_root), capture_output=True, text=True, encoding="utf-8")
+    if tree.returncode != 0:
+        print(f"  ⚠️  {ref} 확인 불가 (이미지 점검 생략): {tree.stderr.strip()}")
+        return problems
+    remote = {}
+    for entry in filter(None, tree.stdout.split("\0")):
+        meta, rel = entry.split("\t", 1)
+        remote[rel] = meta.split()[2]
+
+    hashed = subprocess.run(["git", "hash-object", "--", *rels],
+                            cwd=str(repo_root), capture_output=True, text=True, encoding="utf-8")
+    if hashed.returncode != 0:
+        print(f"  ⚠️  로컬 이미지 해시 계산 실패 (내용 비교 생략): {hashed.stderr.strip()}")
+        local_hashes = None
+    else:
+        local_hashes = dict(zip(rels, hashed.stdout.split()))
+
+    for rel, name in local.items():
+        if rel not in remote:
+            problems.append((name, f"{ref} 에 없음 (push 안 됨)"))
+        elif local_hashes is not None and local_hashes.get(rel) != remote[rel]:
+            problems.append((name, f"{ref} 와 내용 다름 (변경분 push 안 됨)"))
+    return problems
+
+
+def escape_html(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+# (언어, 코드 sha1) → 완성된 <pre> HTML. 튜토리얼 글마다 반복되는 스니펫은 한 번만 렉싱
+# 예약 발행 데몬처럼 오래 도는 프로세스에서 무한히 커지지 않게 최근 사용 순으로 HIGHLIGHT_CACHE_SIZE 개까지만 보관
+HIGHLIGHT_CACHE_SIZE = 512
+_highlight_cache = {}
+_code_formatter = None
+
+
+def _pygments_highlight(code: str, lang: str) -> Optional[str]:
+    """pygments로 인라인 스타일 하이라이트. 미설치/모르는 언어면 None
+    (import는 여기서만 → 코드 블록 없는 글은 pygments 로딩 비용 없음)"""
+    global _code_formatter
+    try:
+        from pygments import highlight
+        from pygments.formatters import HtmlFormatter
+        from pygments.lexers import get_lexer_by_name
+        from pygments.util import ClassNotFound
+    except ImportError:
+        return None
+    try:
+        lexer = get_lexer_by_name(lang, stripnl=False, ensurenl=False)
+    except ClassNotFound:
+        return None
+    if _code_formatter is None:
+        # 티스토리 본문에는 CSS를 못 넣으므로 noclasses=True (span마다 인라인 style)
+        _code_formatter = HtmlFormatter(nowrap=True, noclasses=True, style=CODE_THEME)
+    out = highlight(code, lexer, _code_formatter)
+    return out if code.endswith("\n") else out.rstrip("\n")
+
+
+def highlight_code(code: str, lang: str = "") -> str:
+    """코드 블록 → <pre><code> HTML (언어 태그가 있으면 빌드 타임 하이라이트, 결과는 메모이즈)"""
+    lang = lang.split()[0].lower() if lang.strip() else ""
+    key = (lang, hashlib.sha1(code.encode("utf-8")).hexdigest())
+    cached = _highlight_cache.pop(key, None)
+    if cached is not None:
+        _highlight_cache[key] = cached   # 최근 사용으로 (dict 끝으로 이동)
+        return cached
+
+    inner = _pygments_highlight(code, lang) if lang else None
+    if inner is None:
+        inner = escape_html(code)
+    html = f'<pre style="{CODE_PRE_STYLE}"><code>{inner}</code></pre>'
+    _highlight_cache[key] = html
+    if len(_highlight_cache) > HIGHLIGHT_CACHE_SIZE:
+        del _highlight_cache[next(iter(_highlight_cache))]   # 가장 오래 안 쓴 항목
+    return html
+
+
+INLINE_CODE_RE = re.compile(r"`([^`]+)`")
+BOLD_RE        = re.compile(r"\*\*(.+?)\*\*")
+ITALIC_RE      = re.compile(r"\*(.+?)\*")
+LINK_RE        = re.compile(r"\[(.+?)\]\((.+?)\)")
+AUTOLINK_RE    = re.compile(r"(?<![\"'(])(https?://[^\s<]+)")
+INLINE_MARKUP_RE = re.compile(r"[`*\[]|https?://")   # inline_format 이 바꿀 게 있는지 빠른 판별
+
+
 def inline_format(text: str) -> str:
     """볼드, 이탤릭, 인라인코드, 링크 인라인 변환"""
-    text = re.sub(r"`([^`]+)`", lambda m: f'<code style="background:#f0f0f0;padding:2px 5px;border-radius:3px;font-family:monospace;">{m.group(1).replace("&","&amp;").replace("<","&lt;").replace(">","&gt;")}</code>', text)
-    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
-    text = re.sub(r"\*(.+?)\*",     r"<em>\1</em>",         text)
-    text = re.sub(r"\[(.+?)\]\((.+?)\)", r'<a href="\2">\1</a>', text)
-    text = re.sub(r"(?<![\"'(])(https?://[^\s<]+)", r'<a href="\1">\1</a>', text)
+    text = INLINE_CODE_RE.sub(lambda m: f'<code style="background:#f0f0f0;padding:2px 5px;border-radius:3px;font-family:monospace;">{escape_html(m.group(1))}</code>', text)
+    text = BOLD_RE.sub(r"<strong>\1</strong>", text)
+    text = ITALIC_RE.sub(r"<em>\1</em>", text)
+    text = LINK_RE.sub(r'<a href="\2">\1</a>', text)
+    text = AUTOLINK_RE.sub(r'<a href="\1">\1</a>', text)
     return text
 
 
-def md_to_html(md: str) -> str:
+WIKILINK_RE = re.compile(r"(?<!!)\[\[([^\]|#]+)(?:#[^\]|]*)?(?:\|([^\]]+))?\]\]")
+
+
+def wikilink_html(m, wikilink: Callable[[str], Optional[str]]) -> str:
+    target = m.group(1).strip()
+    text = (m.group(2) or target).strip()
+    url = wikilink(target)
+    return f'<a href="{url}">{text}</a>' if url else text
+
+
+def replace_wikilinks(line: str, wikilink: Callable[[str], Optional[str]]) -> str:
+    """한 줄의 [[링크]] 치환 (인라인 코드 `...` 안은 그대로 → [[...]] 문법 설명 글이 깨지지 않게)"""
+    out, pos = [], 0
+    for m in INLINE_CODE_RE.finditer(line):
+        out.append(WIKILINK_RE.sub(lambda w: wikilink_html(w, wikilink), line[pos:m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(WIKILINK_RE.sub(lambda w: wikilink_html(w, wikilink), line[pos:]))
+    return "".join(out)
+
+
+# ── 테이블 (행 단위 스트리밍: 헤더 1행만 구분선 확인 전까지 보류) ──
+TABLE_OPEN = '<table border="1" style="border-collapse:collapse;width:100%;margin:1em 0;">'
+TABLE_SEP_RE = re.compile(r"^[\|\s\-:]+$")
+
+
+def table_alignments(sep_row: str) -> list:
+    """구분선 |:---|:---:|---:| → 열별 정렬 ["left", "center", "right"]"""
+    aligns = []
+    for c in sep_row.strip().strip("|").split("|"):
+        c = c.strip()
+        if len(c) > 1 and c.startswith(":") and c.endswith(":"):
+            aligns.append("center")
+        elif c.endswith(":"):
+            aligns.append("right")
+        else:
+            aligns.append("left")
+    return aligns
+
+
+def table_cell_tags(tag: str, aligns: list) -> tuple:
+    """열별 여는 태그 목록 + 정렬 정보가 없는 열에 쓸 기본 태그 (스타일 문자열은 표마다 한 번만 생성)"""
+    def open_tag(align):
+        return f'<{tag} style="padding:6px 12px;text-align:{align};">'
+    return [open_tag(a) for a in aligns], open_tag("left"), f"</{tag}>"
+
+
+def table_row_html(row: str, tags: tuple) -> str:
+    opens, default_open, close = tags
+    n = len(opens)
+    parts = ["<tr>"]
+    for i, c in enumerate(row.strip().strip("|").split("|")):
+        c = c.strip()
+        if INLINE_MARKUP_RE.search(c):
+            c = inline_format(c)
+        parts.append(opens[i] if i < n else default_open)
+        parts.append(c)
+        parts.append(close)
+    parts.append("</tr>")
+    return "".join(parts)
+
+
+def md_to_html(md: str, wikilink: Optional[Callable[[str], Optional[str]]] = None) -> str:
+    """마크다운 → HTML. wikilink(대상) 을 주면 [[다른 글]] 을 발행 URL 링크로 변환 (없으면 글자만 남김)"""
     lines = md.split("\n")
     html = []
     in_ul = False      # 순서 없는 목록
     in_ol = False      # 순서 있는 목록
     in_code = False
+    code_lang = ""
     code_lines = []
     in_table = False
-    table_rows = []
+    table_head = None    # 구분선 확인 전까지 보류 중인 헤더 행
+    td_tags = None       # 본문 행 열별 태그 (구분선에서 정렬 확정)
 
     def flush_ul():
         nonlocal in_ul
@@ -113,55 +358,67 @@ def md_to_html(md: str) -> str:
         flush_ul()
         flush_ol()
 
+    def emit_table_head(aligns):
+        nonlocal table_head, td_tags
+        html.append(table_row_html(table_head, table_cell_tags("th", aligns)))
+        td_tags = table_cell_tags("td", aligns)
+        table_head = None
+
     def flush_table():
-        nonlocal in_table, table_rows
-        if not table_rows:
+        nonlocal in_table
+        if not in_table:
             return
-        thtml = ['<table border="1" style="border-collapse:collapse;width:100%;margin:1em 0;">']
-        for i, row in enumerate(table_rows):
-            cells = [c.strip() for c in row.strip().strip("|").split("|")]
-            tag = "th" if i == 0 else "td"
-            style = ' style="padding:6px 12px;text-align:left;"'
-            thtml.append("<tr>" + "".join(f"<{tag}{style}>{inline_format(c)}</{tag}>" for c in cells) + "</tr>")
-        thtml.append("</table>")
-        html.append("\n".join(thtml))
-        table_rows = []
+        if table_head is not None:
+            emit_table_head([])
+        html.append("</table>")
         in_table = False
 
     for line in lines:
         stripped = line.strip()
 
-        # ── 코드 블록 (``` 으로 감싸진 영역은 내부 변환 없이 그대로) ──
+        # ── 코드 블록 (``` 으로 감싸진 영역은 md 변환 없이 하이라이트만) ──
         if stripped.startswith("```"):
             if not in_code:
                 flush_list()
                 flush_table()
                 in_code = True
+                code_lang = stripped[3:].strip()
                 code_lines = []
             else:
-                code_str = "\n".join(code_lines)
-                html.append(f'<pre style="background:#1e2d3d;color:#7dd3fc;padding:1em;border-radius:6px;overflow-x:auto;font-family:monospace;font-size:14px;line-height:1.6;"><code>{code_str}</code></pre>')
+                html.append(highlight_code("\n".join(code_lines), code_lang))
                 in_code = False
                 code_lines = []
             continue
 
         if in_code:
-            # 코드 블록 내부: HTML 이스케이프만, md 변환 없음
-            safe = line.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            code_lines.append(safe)
+            # 코드 블록 내부: 원문 그대로 모았다가 닫힐 때 이스케이프/하이라이트
+            code_lines.append(line)
             continue
 
-        # ── 테이블 ──
+        # ── 옵시디언 노트 링크 [[글]] / [[글|표시]] / [[글#소제목]] ──
+        if wikilink is not None and "[[" in line:
+            line = replace_wikilinks(line, wikilink)
+            stripped = line.strip()
+
+        # ── 테이블 (구분선 검사는 헤더 바로 다음 줄에서만) ──
         if stripped.startswith("|"):
             flush_list()
-            if re.match(r"^[\|\s\-:]+$", stripped):
+            if not in_table:
+                if TABLE_SEP_RE.match(stripped):
+                    continue
+                html.append(TABLE_OPEN)
+                in_table = True
+                table_head = stripped
                 continue
-            in_table = True
-            table_rows.append(stripped)
+            if table_head is not None:
+                if TABLE_SEP_RE.match(stripped):
+                    emit_table_head(table_alignments(stripped))
+                    continue
+                emit_table_head([])
+            html.append(table_row_html(stripped, td_tags))
             continue
-        else:
-            if in_table:
-                flush_table()
+        elif in_table:
+            flush_table()
 
         # ── 헤딩 ──
         if line.startswith("### "):
@@ -218,125 +475,779 @@ def md_to_html(md: str) -> str:
     return "\n".join(html)
 
 
-def parse_markdown(filepath: str):
-    """마크다운 → 제목 + HTML (이미지는 GitHub raw URL로 변환)"""
-    content = Path(filepath).read_text(encoding="utf-8")
+FRONT_MATTER_DELIM = "---"
+
+# front matter 공개 설정 값 → VISIBILITY_INPUTS 키
+VISIBILITY_ALIASES = {
+    "public": "public", "공개": "public",
+    "protected": "protected", "보호": "protected",
+    "private": "private", "비공개": "private",
+}
 
-    # 첫 H1을 제목으로
+
+def _scalar(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _parse_front_matter_lines(lines) -> Optional[dict]:
+    """--- 다음 줄부터 받아 닫는 --- 까지 파싱
+    닫는 줄이 없거나 `키:` 줄이 하나도 없으면 None (가로줄 --- 로 시작하는 글을 front matter 로 오인하지 않게)
+    지원: `키: 값`, `키: [a, b]`, 다음 줄들의 `- 항목` 목록, `#` 주석 (YAML의 작은 부분집합)"""
+    meta = {}
+    last_key = None
+    for line in lines:
+        stripped = line.strip()
+        if stripped == FRONT_MATTER_DELIM:
+            return meta or None
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and last_key is not None:
+            if not isinstance(meta[last_key], list):
+                meta[last_key] = []
+            meta[last_key].append(_scalar(stripped[2:]))
+            continue
+        key, sep, value = line.partition(":")
+        if not sep or not key.strip():
+            continue
+        last_key = key.strip()
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            meta[last_key] = [_scalar(v) for v in value[1:-1].split(",") if v.strip()]
+        else:
+            meta[last_key] = _scalar(value)
+    return None
+
+
+def read_front_matter(path) -> dict:
+    """파일 맨 앞 --- 블록만 읽음 (본문은 읽지 않으므로 posts/ 전체를 훑어도 가벼움)"""
+    with open(path, encoding="utf-8") as f:
+        if f.readline().strip() != FRONT_MATTER_DELIM:
+            return {}
+        return _parse_front_matter_lines(f) or {}
+
+
+def split_front_matter(content: str) -> tuple:
+    """본문 문자열 → (front matter 딕셔너리, front matter 를 뗀 본문)
+    헤더 줄만 훑고 본문은 자르기만 함 (본문 전체를 줄 단위로 나누지 않음)"""
+    if not content.startswith(FRONT_MATTER_DELIM):
+        return {}, content
+    first_nl = content.find("\n")
+    if first_nl == -1 or content[:first_nl].strip() != FRONT_MATTER_DELIM:
+        return {}, content
+    pos = first_nl + 1
+    while True:
+        nl = content.find("\n", pos)
+        end = len(content) if nl == -1 else nl
+        if content[pos:end].strip() == FRONT_MATTER_DELIM:
+            meta = _parse_front_matter_lines(content[first_nl + 1:end + 1].split("\n"))
+            if meta is None:
+                return {}, content
+            return meta, content[end + 1:]
+        if nl == -1:
+            return {}, content
+        pos = nl + 1
+
+
+def post_meta(meta: dict) -> dict:
+    """front matter → 발행 옵션 {"title", "tags", "category", "visibility"} (없는 값은 None / [])
+    visibility 는 별칭(공개/보호/비공개 등)만 정규화하고, 모르는 값은 그대로 둠
+    (검사는 발행하는 쪽에서 → 헤더 하나가 잘못돼도 render / 빌드는 계속 동작)"""
+    tags = meta.get("tags") or []
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(",")]
+    visibility = meta.get("visibility")
+    if visibility:
+        visibility = VISIBILITY_ALIASES.get(str(visibility).lower(), str(visibility))
+    return {
+        "title":      meta.get("title") or None,
+        "tags":       [t.lstrip("#") for t in tags if t],
+        "category":   meta.get("category") or None,
+        "visibility": visibility or None,
+    }
+
+
+def extract_title(content: str, filepath: str) -> str:
+    """첫 H1을 제목으로 (없으면 파일명)"""
     title_match = re.search(r"^#\s+(.+)", content, re.MULTILINE)
-    title = title_match.group(1).strip() if title_match else Path(filepath).stem
+    return title_match.group(1).strip() if title_match else Path(filepath).stem
+
+
+def parse_markdown(filepath: str, image_url: Callable[[str], Optional[str]] = github_raw_url,
+                   wikilink: Optional[Callable[[str], Optional[str]]] = None):
+    """마크다운 → (제목, HTML, 발행 옵션)
+    제목은 front matter title → 첫 H1 → 파일명 순. 발행 옵션은 post_meta() 결과 (태그/카테고리/공개 설정)
+    이미지는 image_url(파일명) 으로 변환 (기본: GitHub raw URL, 업로드 모드: 티스토리 CDN URL)
+    [[링크]] 는 wikilink(대상) 으로 변환. 생략 시 본문에 [[링크]] 가 있을 때만 wikilink_resolver() 를 만듦
+    (링크 없는 글은 링크 인덱스/발행 기록을 읽지 않음. 여러 글을 변환할 땐 resolver 하나를 넘겨서 재사용)"""
+    meta, content = split_front_matter(Path(filepath).read_text(encoding="utf-8"))
+    opts = post_meta(meta)
+    title = opts["title"] or extract_title(content, filepath)
 
     # 옵시디언 이미지 ![[파일명.png]] → <img src="GitHub raw URL">
     def replace_obsidian_image(m):
         img_name = m.group(1).split("|")[0].strip()
-        url = github_raw_url(img_name)
+        url = image_url(img_name)
         if url:
             print(f"  🖼️  {img_name}")
             return f'<img src="{url}" alt="{img_name}" style="max-width:100%;">'
         return ""
 
-    body = re.sub(r"!\[\[(.+?)\]\]", replace_obsidian_image, content)
+    body = OBSIDIAN_IMAGE_RE.sub(replace_obsidian_image, content)
 
     # 일반 마크다운 이미지 ![alt](path)
     def replace_md_image(m):
         alt, src = m.group(1), m.group(2)
         if src.startswith("http"):
             return f'<img src="{src}" alt="{alt}" style="max-width:100%;">'
-        url = github_raw_url(Path(src).name)
+        url = image_url(Path(src).name)
         if url:
             return f'<img src="{url}" alt="{alt}" style="max-width:100%;">'
         return ""
 
-    body = re.sub(r"!\[([^\]]*)\]\(([^)]+)\)", replace_md_image, body)
-
-    body = md_to_html(body)
-    return title, body
-
-
-async def post_to_tistory(title: str, content: str, draft: bool = False):
-    blog = CONFIG["blog_name"]
-    write_url = f"https://{blog}.tistory.com/manage/newpost/"
-
+    body = MD_IMAGE_RE.sub(replace_md_image, body)
+
+    if wikilink is None and WIKILINK_RE.search(content):
+        wikilink = wikilink_resolver()
+    body = md_to_html(body, wikilink=wikilink)
+    return title, body, opts
+
+
+def ledger_key(path) -> str:
+    """발행 기록 키: 레포 기준 상대경로 (레포 밖 파일은 절대경로)"""
+    resolved = Path(path).resolve()
+    try:
+        return resolved.relative_to(Path(__file__).parent.resolve()).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def load_ledger() -> dict:
+    """발행 기록 {상대경로: {"title", "url", "published_at"}}"""
+    if LEDGER_FILE.exists():
+        return json.loads(LEDGER_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def record_published(path, title: str, url: str):
+    ledger = load_ledger()
+    ledger[ledger_key(path)] = {"title": title, "url": url,
+                                "published_at": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+    tmp = LEDGER_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(ledger, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(LEDGER_FILE)
+
+
+def read_title(path) -> str:
+    """글 제목만 읽기: front matter title → 첫 H1 (찾는 즉시 멈춤) → 파일명"""
+    meta = read_front_matter(path)
+    if meta.get("title"):
+        return meta["title"]
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("# "):
+                return line[2:].strip()
+    return Path(path).stem
+
+
+def post_link_keys(path) -> list:
+    """[[...]] 로 이 글을 가리킬 수 있는 이름들: 파일명, 제목, front matter aliases"""
+    aliases = read_front_matter(path).get("aliases") or []
+    if isinstance(aliases, str):
+        aliases = [a.strip() for a in aliases.split(",")]
+    names = [Path(path).stem, read_title(path), *aliases]
+    return list(dict.fromkeys(n.strip().lower() for n in names if n and n.strip()))
+
+
+_link_lookup = None   # 이름(소문자) → 발행 기록 키 (프로세스 안에서 재사용)
+
+
+def load_link_index() -> dict:
+    """posts/*.md 링크 인덱스 → {이름: 발행 기록 키}
+    LINK_INDEX_FILE 에 글별 mtime 과 이름을 저장해두고, 바뀐/새 글만 다시 읽음 (삭제된 글은 제거)"""
+    global _link_lookup
+    index = {}
+    if LINK_INDEX_FILE.exists():
+        index = json.loads(LINK_INDEX_FILE.read_text(encoding="utf-8"))
+
+    changed = False
+    seen = set()
+    for md in (Path(__file__).parent / "posts").glob("*.md"):
+        key = ledger_key(md)
+        seen.add(key)
+        mtime = md.stat().st_mtime
+        entry = index.get(key)
+        if entry is None or entry["mtime"] != mtime:
+            index[key] = {"mtime": mtime, "names": post_link_keys(md)}
+            changed = True
+    for key in set(index) - seen:
+        del index[key]
+        changed = True
+
+    if changed or _link_lookup is None:
+        if changed:
+            tmp = LINK_INDEX_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(index, ensure_ascii=False, indent=1), encoding="utf-8")
+            tmp.replace(LINK_INDEX_FILE)
+        _link_lookup = {name: key for key, entry in sorted(index.items()) for name in entry["names"]}
+    return _link_lookup
+
+
+def wikilink_resolver() -> Callable[[str], Optional[str]]:
+    """[[대상]] → 발행된 티스토리 URL (인덱스/발행 기록은 한 번만 읽고, 링크마다 딕셔너리 조회 한 번)"""
+    lookup = load_link_index()
+    ledger = load_ledger()
+
+    def resolve(target: str) -> Optional[str]:
+        entry = ledger.get(lookup.get(target.strip().lower(), ""))
+        if entry is None:
+            print(f"  ⚠️  링크 대상 없음/미발행: [[{target}]]")
+            return None
+        return entry["url"]
+    return resolve
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_image_map() -> dict:
+    """업로드 이미지 맵 {sha256: {"url": 티스토리 CDN URL, "name": 최초 파일명}}"""
+    if IMAGE_MAP_FILE.exists():
+        return json.loads(IMAGE_MAP_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_image_map(image_map: dict):
+    tmp = IMAGE_MAP_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(image_map, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(IMAGE_MAP_FILE)
+
+
+async def upload_images(names: list) -> dict:
+    """이미지를 티스토리 에디터 첨부 API로 업로드 → {파일명: CDN URL}
+    내용 해시가 이미 맵에 있으면 재업로드 없이 재사용 (글이 달라도 같은 이미지는 1번만 업로드)
+    브라우저 없이 세션 쿠키만 실은 HTTP 요청으로 병렬 업로드
+    base_url 로 테스트 서버를 쓸 때는 실제 맵을 읽지도 쓰지도 않음 (가짜 URL 이 섞이지 않게)"""
+    import asyncio
+    import mimetypes
+
+    testing = bool(CONFIG["base_url"])
+    image_map = {} if testing else load_image_map()
+    digests = {}   # 파일명 → sha256
+    pending = {}   # sha256 → 경로 (업로드 필요)
+    for name in names:
+        path = find_image(name)
+        if path is None:
+            continue
+        digests[name] = digest = file_sha256(path)
+        if digest not in image_map:
+            pending.setdefault(digest, path)
+
+    if pending:
+        attach_url = blog_url("/manage/post/attach.json")
+        async_playwright = load_playwright()
+        async with async_playwright() as p:
+            request = await p.request.new_context(
+                storage_state=session_state(),
+                extra_http_headers={"Referer": blog_url("/manage/newpost/")},
+            )
+            limit = asyncio.Semaphore(IMAGE_UPLOAD_CONCURRENCY)
+
+            async def upload(digest: str, path: Path):
+                async with limit:
+                    resp = await request.post(attach_url, multipart={"file": {
+                        "name":     path.name,
+                        "mimeType": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+                        "buffer":   path.read_bytes(),
+                    }})
+                    if not resp.ok:
+                        raise Exception(f"❌ 이미지 업로드 실패: {path.name} (HTTP {resp.status})")
+                    data = await resp.json()
+                    if not data.get("url"):
+                        raise Exception(f"❌ 이미지 업로드 응답에 URL 없음: {path.name} ({data})")
+                    image_map[digest] = {"url": data["url"], "name": path.name}
+                    print(f"  ⬆️  업로드: {path.name}")
+
+            results = await asyncio.gather(*(upload(d, path) for d, path in pending.items()),
+                                           return_exceptions=True)
+            await request.dispose()
+        # 일부 실패해도 성공분은 맵에 남겨서 다음 실행 때 재업로드하지 않음
+        if not testing:
+            save_image_map(image_map)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+
+    return {name: image_map[digest]["url"] for name, digest in digests.items()}
+
+
+async def is_logged_in(page) -> bool:
+    """티스토리 메인에서 내 정보 영역이 보이면 세션 유효"""
+    print("🔐 세션으로 로그인 상태 확인 중...")
+    await page.goto(home_url())
+    await page.wait_for_load_state("networkidle")
+    return bool(await page.query_selector("a.link_myinfo, .area_my, [class*='my_info']"))
+
+
+async def check_session() -> bool:
+    async_playwright = load_playwright()
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(storage_state=str(SESSION_FILE))
+        context = await browser.new_context(storage_state=session_state())
         page = await context.new_page()
-
-        # 로그인 상태 확인
-        print("🔐 세션으로 로그인 상태 확인 중...")
-        await page.goto("https://www.tistory.com")
-        await page.wait_for_load_state("networkidle")
-
-        is_logged_in = await page.query_selector("a.link_myinfo, .area_my, [class*='my_info']")
-        if not is_logged_in:
-            print("⚠️  세션이 만료되었습니다. tistory_login.py 를 다시 실행해주세요.")
-            await browser.close()
-            return
-
-        print("✅ 세션 로그인 성공")
-
-        # 글쓰기 페이지로 이동
-        print("📝 글쓰기 페이지 이동 중...")
-        await page.goto(write_url)
-        await page.wait_for_load_state("networkidle")
-        await page.wait_for_timeout(2000)
-
-        # 제목 입력
-        await page.fill("textarea#post-title-inp", title)
-        print(f"📌 제목 입력: {title}")
-
-        # TinyMCE 에디터 로딩 대기
-        await page.wait_for_timeout(3000)
-
-        escaped = content.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
-
-        # TinyMCE에 본문 주입
-        injected = await page.evaluate(f"""
-            (() => {{
-                if (typeof tinymce !== 'undefined') {{
-                    const ed = tinymce.activeEditor || tinymce.editors[0];
-                    if (ed) {{
-                        ed.setContent(`{escaped}`);
-                        ed.save();
-                        ed.fire('change');
-                        ed.fire('input');
-                        return 'tinymce';
-                    }}
-                }}
-                const ta = document.querySelector('textarea#editor-tistory');
-                if (ta) {{
-                    ta.value = `{escaped}`;
-                    ta.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                    ta.dispatchEvent(new Event('input',  {{ bubbles: true }}));
-                    return 'textarea';
+        ok = await is_logged_in(page)
+        await browser.close()
+    return ok
+
+
+def process_memory_mb(pids) -> Optional[float]:
+    """프로세스들의 메모리 합계 (MB). /proc 의 PSS (공유 메모리는 나눠서 계산), 없으면 RSS
+    Linux 가 아니라 읽을 수 없으면 None"""
+    total, found = 0, False
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                kb = next(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+            total += kb * 1024
+            found = True
+        except (OSError, StopIteration, ValueError):
+            try:
+                with open(f"/proc/{pid}/statm") as f:
+                    total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+                found = True
+            except (OSError, ValueError, IndexError, AttributeError):
+                continue
+    return round(total / 2**20, 1) if found else None
+
+
+def _mb(value: Optional[float]) -> str:
+    return "?" if value is None else f"{value:.0f}MB"
+
+
+class BrowserPool:
+    """오래 켜두는 발행용 브라우저 (로그인 확인이 끝난 컨텍스트를 여러 발행에 재사용)
+
+    자원 관리:
+      - 동시에 여는 탭은 max_pages 개까지 (넘는 작업은 탭이 빌 때까지 대기)
+      - 작업이 끝날 때마다 CDP 로 탭의 JS 힙 / DOM 노드 수와 브라우저 전체 메모리를 재서 로그에 남김
+      - 컨텍스트 하나로 max_jobs 건을 처리하면 컨텍스트를 새로 만들고 (쿠키는 이어받음),
+        브라우저 메모리가 max_mb 를 넘으면 브라우저를 다시 띄움
+        (둘 다 열린 탭이 모두 끝난 뒤, 다음 작업 시작 전에 처리)
+    max_jobs / max_mb 를 0 으로 주면 해당 조건은 끔
+    """
+
+    def __init__(self, max_pages: int = BROWSER_MAX_PAGES, max_jobs: int = BROWSER_MAX_JOBS,
+                 max_mb: float = BROWSER_MAX_MB):
+        import asyncio
+
+        self.max_pages = max_pages
+        self.max_jobs = max_jobs
+        self.max_mb = max_mb
+        self._pw = None
+        self._browser = None
+        self._cdp = None            # 브라우저 CDP 세션 (프로세스 목록 조회용)
+        self.context = None
+        self._cond = asyncio.Condition()
+        self._slots = asyncio.Semaphore(max_pages)
+        self.active = 0             # 열려 있는 작업 탭 수
+        self.jobs = 0               # 현재 컨텍스트로 처리한 작업 수
+        self.total_jobs = 0
+        self.recycles = 0           # 컨텍스트 재생성 횟수
+        self.relaunches = 0         # 브라우저 재시작 횟수
+        self.recycle_due = None     # None / "jobs" / "memory"
+        self.browser_mb = None
+
+    async def warm(self):
+        """브라우저 실행 + 로그인 확인 (이미 떠 있으면 그대로)"""
+        async with self._cond:
+            if self.context is None:
+                await self._launch()
+        return self.context
+
+    async def _launch(self, storage_state=None):
+        started = time.perf_counter()
+        if self._pw is None:
+            self._pw = await load_playwright()().start()
+        if self._browser is None:
+            self._browser = await self._pw.chromium.launch(headless=True)
+            self._cdp = await self._browser.new_browser_cdp_session()
+        self.context = await self._browser.new_context(storage_state=storage_state or session_state())
+        self.jobs = 0
+        if storage_state is not None:
+            return   # 재생성: 이전 컨텍스트의 쿠키를 이어받았으므로 로그인 확인 생략
+        page = await self.context.new_page()
+        try:
+            if not await is_logged_in(page):
+                raise Exception("⚠️  세션이 만료되었습니다. tistory_login.py 를 다시 실행해주세요.")
+        finally:
+            await page.close()
+        print(f"✅ 세션 로그인 성공 (브라우저 준비 {time.perf_counter() - started:.1f}s)")
+
+    async def _recycle(self):
+        reason, before = self.recycle_due, self.browser_mb
+        state = await self.context.storage_state()
+        await self.context.close()
+        self.context = None
+        if reason == "memory":
+            await self._browser.close()
+            self._browser = self._cdp = None
+            self.relaunches += 1
+        else:
+            self.recycles += 1
+        await self._launch(storage_state=state)
+        self.recycle_due = None
+        self.browser_mb = await self.browser_memory()
+        what = "브라우저 재시작" if reason == "memory" else "컨텍스트 재생성"
+        print(f"♻️  {what} ({'메모리 상한' if reason == 'memory' else f'{self.max_jobs}건 처리'}): "
+              f"브라우저 {_mb(before)} → {_mb(self.browser_mb)}")
+
+    async def _acquire(self):
+        async with self._cond:
+            # 재생성 예정이면 열린 탭이 모두 끝날 때까지 새 탭을 열지 않음
+            await self._cond.wait_for(lambda: not (self.recycle_due and self.active))
+            if self.context is None:
+                await self._launch()
+            elif self.recycle_due:
+                await self._recycle()
+            self.active += 1
+
+    async def _release(self):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    async def page_metrics(self, page) -> dict:
+        """탭 하나의 CDP Performance 지표 (JS 힙, DOM 노드/문서, 이벤트 리스너 수)"""
+        session = await self.context.new_cdp_session(page)
+        try:
+            await session.send("Performance.enable")
+            metrics = {m["name"]: m["value"] for m in (await session.send("Performance.getMetrics"))["metrics"]}
+        finally:
+            await session.detach()
+        return {
+            "js_heap_mb": round(metrics.get("JSHeapUsedSize", 0) / 2**20, 1),
+            "dom_nodes":  int(metrics.get("Nodes", 0)),
+            "documents":  int(metrics.get("Documents", 0)),
+            "listeners":  int(metrics.get("JSEventListeners", 0)),
+        }
+
+    async def browser_memory(self) -> Optional[float]:
+        """브라우저 전체(브라우저/렌더러/GPU 등 모든 프로세스) 메모리 MB, 측정 불가면 None"""
+        if self._cdp is None:
+            return None
+        try:
+            info = await self._cdp.send("SystemInfo.getProcessInfo")
+        except Exception:
+            return None
+        return process_memory_mb(p["id"] for p in info["processInfo"])
+
+    async def _finish(self, page) -> dict:
+        """작업 끝: 탭 측정 후 닫기 → 브라우저 측정 → 재생성 필요 여부 판단 → 로그"""
+        stats = {}
+        if page is not None:
+            try:
+                stats.update(await self.page_metrics(page))
+            except Exception:
+                pass   # 탭이 이미 죽었으면 측정 생략
+            await page.close()
+        self.jobs += 1
+        self.total_jobs += 1
+        self.browser_mb = await self.browser_memory()
+        if self.max_mb and self.browser_mb is not None and self.browser_mb >= self.max_mb:
+            self.recycle_due = "memory"
+        elif self.max_jobs and self.jobs >= self.max_jobs and not self.recycle_due:
+            self.recycle_due = "jobs"
+        stats.update(self.stats())
+        print(f"🧠 자원: 탭 JS 힙 {_mb(stats.get('js_heap_mb'))} · DOM 노드 {stats.get('dom_nodes', '?')} · "
+              f"브라우저 {_mb(self.browser_mb)}/{self.max_mb or '∞'}MB · "
+              f"컨텍스트 {self.jobs}/{self.max_jobs or '∞'}건 · 탭 {self.active}/{self.max_pages}")
+        return stats
+
+    @contextlib.asynccontextmanager
+    async def page(self, report: Optional[dict] = None):
+        """작업용 탭 하나 (동시 탭 수 제한). 끝나면 측정 후 닫고, 측정값을 report 딕셔너리에 기록"""
+        async with self._slots:
+            await self._acquire()
+            page = None
+            try:
+                page = await self.context.new_page()
+                yield page
+            finally:
+                try:
+                    stats = await self._finish(page)
+                    if report is not None:
+                        report.update(stats)
+                finally:
+                    await self._release()
+
+    def stats(self) -> dict:
+        return {
+            "browser_mb": self.browser_mb, "jobs": self.jobs, "total_jobs": self.total_jobs,
+            "pages": self.active, "recycles": self.recycles, "relaunches": self.relaunches,
+        }
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+        self._pw = self._browser = self._cdp = self.context = None
+
+
+SAVE_PATH = "/manage/post.json"   # 에디터 저장 요청 (응답에 postId)
+
+
+def post_permalink(data: dict, page_url: str) -> Optional[str]:
+    """발행 후 글 주소: 저장 응답의 entryUrl → postId → 이동한 주소의 postId / 글 번호 순으로 찾음"""
+    if data.get("entryUrl"):
+        return data["entryUrl"]
+    post_id = data.get("postId")
+    if not post_id:
+        parsed = urllib.parse.urlparse(page_url)
+        post_id = urllib.parse.parse_qs(parsed.query).get("postId", [None])[0]
+        if post_id is None and parsed.path.strip("/").isdigit():
+            post_id = parsed.path.strip("/")
+    return blog_url(f"/{post_id}") if post_id else None
+
+
+async def write_post(page, title: str, content: str, draft: bool, mode: str, lap,
+                     before_submit: Optional[Callable[[], Awaitable]] = None,
+                     tags: tuple = (), category: Optional[str] = None) -> str:
+    """열린 페이지에서 글쓰기 (카테고리/태그 포함) → 발행(또는 임시저장) → 최종 URL
+    before_submit 이 있으면 마지막 버튼 클릭 직전에 await (예약 발행: 미리 준비해두고 정시에 클릭)"""
+    visibility_input = VISIBILITY_INPUTS[mode]
+
+    # 글쓰기 페이지로 이동
+    print("📝 글쓰기 페이지 이동 중...")
+    await page.goto(blog_url("/manage/newpost/"))
+    await page.wait_for_load_state("networkidle")
+    await page.wait_for_timeout(2000)
+
+    # 제목 입력
+    await page.fill("textarea#post-title-inp", title)
+    print(f"📌 제목 입력: {title}")
+
+    # TinyMCE 에디터 로딩 대기
+    await page.wait_for_timeout(3000)
+    lap("editor")
+
+    escaped = content.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
+
+    # TinyMCE에 본문 주입
+    injected = await page.evaluate(f"""
+        (() => {{
+            if (typeof tinymce !== 'undefined') {{
+                const ed = tinymce.activeEditor || tinymce.editors[0];
+                if (ed) {{
+                    ed.setContent(`{escaped}`);
+                    ed.save();
+                    ed.fire('change');
+                    ed.fire('input');
+                    return 'tinymce';
                 }}
-                return 'not_found';
-            }})()
-        """)
-        print(f"✍️  본문 입력 완료 (방식: {injected})")
+            }}
+            const ta = document.querySelector('textarea#editor-tistory');
+            if (ta) {{
+                ta.value = `{escaped}`;
+                ta.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                ta.dispatchEvent(new Event('input',  {{ bubbles: true }}));
+                return 'textarea';
+            }}
+            return 'not_found';
+        }})()
+    """)
+    if injected == "not_found":
+        raise Exception("❌ 에디터를 찾지 못했습니다 (본문 주입 실패)")
+    print(f"✍️  본문 입력 완료 (방식: {injected})")
+    await page.wait_for_timeout(2000)
+    lap("inject")
+
+    if category:
+        await page.click(EDITOR_SELECTORS["category_button"])
+        await page.locator(EDITOR_SELECTORS["category_list"]).get_by_text(category, exact=True).first.click()
+        print(f"📁 카테고리: {category}")
+    for tag in tags:
+        await page.fill(EDITOR_SELECTORS["tag_input"], tag)
+        await page.press(EDITOR_SELECTORS["tag_input"], "Enter")
+    if tags:
+        print(f"🏷️  태그: {', '.join(tags)}")
+
+    if draft:
+        if before_submit is not None:
+            await before_submit()
+            lap("hold")
+        await page.click("a.action")
+        await page.wait_for_timeout(3000)
+        print("💾 임시저장 완료")
+    else:
+        await page.click("button.btn.btn-default")
         await page.wait_for_timeout(2000)
+        print("📋 발행 팝업 열림")
 
-        if draft:
-            await page.click("a.action")
-            await page.wait_for_timeout(3000)
-            print("💾 임시저장 완료")
-        else:
-            await page.click("button.btn.btn-default")
-            await page.wait_for_timeout(2000)
-            print("📋 발행 팝업 열림")
+        await page.click(f"input#{visibility_input}")
+        await page.wait_for_timeout(500)
+        print(f"🌐 공개 설정 완료 ({mode})")
 
-            await page.click("input#open20")
-            await page.wait_for_timeout(500)
-            print("🌐 공개 설정 완료")
+        if before_submit is not None:
+            await before_submit()
+            lap("hold")
 
-            await page.click("button#publish-btn")
-            await page.wait_for_load_state("networkidle")
-            await page.wait_for_timeout(2000)
+        # 저장 응답(postId)을 잡아둠 → 발행 후 이동하는 관리 화면 URL 대신 글 주소를 기록
+        saved = []
 
-            print(f"\n🎉 발행 완료!")
-            print(f"🔗 URL: {page.url}")
+        def on_response(resp):
+            if resp.request.method == "POST" and urllib.parse.urlparse(resp.url).path == SAVE_PATH:
+                saved.append(resp)
 
-        await browser.close()
+        page.on("response", on_response)
+        await page.click("button#publish-btn")
+        await page.wait_for_load_state("networkidle")
+        await page.wait_for_timeout(2000)
+        page.remove_listener("response", on_response)
+
+        data = {}
+        if saved:
+            try:
+                data = await saved[-1].json()
+            except Exception:
+                pass
+        url = post_permalink(data, page.url)
+        if url is None:
+            url = page.url
+            print(f"  ⚠️  글 번호를 찾지 못해 현재 페이지 주소를 기록합니다: {url}")
+
+        print(f"\n🎉 발행 완료!")
+        print(f"🔗 URL: {url}")
+        lap("submit")
+        return url
+
+    url = page.url
+    lap("submit")
+    return url
+
+
+async def post_to_tistory(title: str, content: str, draft: bool = False,
+                          mode: str = "public", timings: Optional[dict] = None,
+                          pool: Optional[BrowserPool] = None,
+                          before_submit: Optional[Callable[[], Awaitable]] = None,
+                          tags: tuple = (), category: Optional[str] = None,
+                          resources: Optional[dict] = None) -> str:
+    """브라우저로 글 발행 → 최종 페이지 URL 반환 (실패 시 Exception)
+    timings 딕셔너리를 넘기면 단계별 소요 시간(초)을 기록
+    pool 을 넘기면 미리 띄워둔 브라우저(BrowserPool)에 새 탭으로 작성, 없으면 이번 발행용으로 띄웠다가 닫음
+    resources 딕셔너리를 넘기면 탭/브라우저 메모리 측정값을 기록"""
+    timings = {} if timings is None else timings
+    last = time.perf_counter()
+
+    def lap(step: str):
+        nonlocal last
+        now = time.perf_counter()
+        timings[step] = round(now - last, 3)
+        last = now
+
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool()
+    try:
+        if own_pool:
+            await pool.warm()
+            lap("launch")
+        async with pool.page(resources) as page:
+            if not own_pool:
+                lap("wait")   # 동시 탭 제한 / 컨텍스트 재생성 대기
+            return await write_post(page, title, content, draft, mode, lap, before_submit,
+                                    tags=tags, category=category)
+    finally:
+        if own_pool:
+            await pool.close()
+
+
+def new_result(path, draft: bool, mode: Optional[str], images: str) -> dict:
+    """publish 결과 딕셔너리 기본형 (CLI 의 조기 실패 결과도 같은 모양으로)"""
+    return {
+        "ok": False, "cancelled": False, "file": None if path is None else str(path), "title": None,
+        "url": None, "draft": draft, "mode": mode, "tags": [], "category": None, "images": images,
+        "timings": {}, "resources": {}, "error": None, "preflight": [],
+    }
+
+
+async def publish(path, *, draft: bool = False, mode: Optional[str] = None, images: str = "github",
+                  preflight: bool = True, confirm: Optional[Callable[[str], bool]] = None,
+                  pool: Optional[BrowserPool] = None,
+                  before_submit: Optional[Callable[[], Awaitable]] = None) -> dict:
+    """비대화형 발행 API (OpenClaw 등에서 subprocess 없이 in-process 호출용)
+
+    예외를 던지지 않고 결과 딕셔너리를 반환:
+      {"ok", "cancelled", "file", "title", "url", "draft", "mode", "tags", "category", "timings", "resources",
+       "error", "preflight"}
+    제목/태그/카테고리/공개 설정은 글의 front matter 에서 읽음 (mode 를 넘기면 front matter 보다 우선, 둘 다 없으면 public)
+    images="github" 는 GitHub raw URL, "upload" 는 티스토리 첨부 업로드 (해시 맵으로 중복 업로드 방지)
+    preflight=True 이면 (github 모드) 브라우저 실행 전에 이미지 push 여부를 점검하고, 문제가 있으면 발행하지 않음
+    confirm(title) 콜백이 False를 반환하면 발행하지 않음 (CLI 확인 프롬프트용)
+    pool / before_submit 은 post_to_tistory 로 그대로 전달 (예약 발행 데몬, 연속 발행용)
+    resources 에는 발행 탭/브라우저 메모리 측정값 (BrowserPool.page 참고)
+    발행에 성공하면 (임시저장 제외) 발행 기록(LEDGER_FILE)에 URL을 남김 (base_url 테스트 서버로 발행한 건 제외)
+    """
+    start = time.perf_counter()
+    result = new_result(path, draft, mode, images)
+    timings = result["timings"]
+    try:
+        if not SESSION_FILE.exists() and not CONFIG["base_url"]:
+            raise Exception("⚠️  세션 파일이 없습니다. 먼저 python3 tistory_login.py 를 실행해주세요.")
+
+        if images not in IMAGE_MODES:
+            raise ValueError(f"❌ 알 수 없는 이미지 모드: {images} (가능: {', '.join(IMAGE_MODES)})")
+
+        meta, content = split_front_matter(Path(path).read_text(encoding="utf-8"))
+        opts = post_meta(meta)
+        mode = mode or opts["visibility"] or "public"
+        if mode not in VISIBILITY_INPUTS:
+            raise ValueError(f"❌ 알 수 없는 공개 모드: {mode} (가능: {', '.join(VISIBILITY_ALIASES)})")
+        title = opts["title"] or extract_title(content, str(path))
+        result.update(title=title, mode=mode, tags=opts["tags"], category=opts["category"])
+
+        if preflight and images == "github":
+            t = time.perf_counter()
+            problems = preflight_images(content)
+            timings["preflight"] = round(time.perf_counter() - t, 3)
+            result["preflight"] = [{"image": name, "problem": why} for name, why in problems]
+            if problems:
+                raise Exception("❌ 이미지 점검 실패: " + ", ".join(f"{n} ({w})" for n, w in problems))
+
+        if confirm is not None and not confirm(title):
+            result["cancelled"] = True
+            return result
+
+        image_url = github_raw_url
+        if images == "upload":
+            t = time.perf_counter()
+            uploaded = await upload_images(referenced_images(content))
+            timings["upload"] = round(time.perf_counter() - t, 3)
+
+            def image_url(name: str) -> Optional[str]:
+                if name not in uploaded:
+                    print(f"  ⚠️  이미지 파일 없음: {name}")
+                return uploaded.get(name)
+
+        t = time.perf_counter()
+        title, body, opts = parse_markdown(str(path), image_url=image_url)
+        timings["parse"] = round(time.perf_counter() - t, 3)
+
+        result["url"] = await post_to_tistory(title, body, draft=draft, mode=mode, timings=timings,
+                                              pool=pool, before_submit=before_submit,
+                                              tags=opts["tags"], category=opts["category"],
+                                              resources=result["resources"])
+        result["ok"] = True
+        if not draft and not CONFIG["base_url"]:
+            record_published(path, title, result["url"])
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        timings["total"] = round(time.perf_counter() - start, 3)
+    return result
 
 
 def git_pull():
@@ -360,47 +1271,178 @@ def get_latest_md():
     return md_files[0] if md_files else None
 
 
-def main():
-    parser = argparse.ArgumentParser(description="티스토리 자동 배포")
-    parser.add_argument("--file",    default=None, help="마크다운 파일 경로")
-    parser.add_argument("--draft",   action="store_true", help="임시저장 (발행 안함)")
-    parser.add_argument("--no-pull", action="store_true", help="git pull 생략")
-    args = parser.parse_args()
-
-    if not SESSION_FILE.exists():
-        print("⚠️  세션 파일이 없습니다. 먼저 아래를 실행해주세요:")
-        print("   python3 tistory_login.py")
-        return
-
-    if not args.no_pull:
-        git_pull()
-
-    if args.file:
-        md_path = Path(__file__).parent / args.file
+def resolve_md_path(file_arg: Optional[str]) -> Optional[Path]:
+    """--file 인자 → 실제 경로 (생략 시 posts/ 최신 파일)"""
+    if file_arg:
+        md_path = Path(__file__).parent / file_arg
         if not md_path.exists():
-            md_path = Path(args.file)
+            md_path = Path(file_arg)
         if not md_path.exists():
-            print(f"❌ 파일 없음: {args.file}")
-            return
+            print(f"❌ 파일 없음: {file_arg}")
+            return None
+        return md_path
+
+    md_path = get_latest_md()
+    if not md_path:
+        print("❌ posts/ 폴더에 md 파일이 없습니다.")
+        return None
+    print(f"📂 최신 파일 자동 선택: {md_path.name}")
+    return md_path
+
+
+def require_session() -> bool:
+    if SESSION_FILE.exists() or CONFIG["base_url"]:
+        return True
+    print("⚠️  세션 파일이 없습니다. 먼저 아래를 실행해주세요:")
+    print("   python3 tistory_login.py")
+    return False
+
+
+def cmd_render(args) -> int:
+    """브라우저 없이 HTML 변환 결과만 출력 (미리보기/디버깅용)"""
+
+    # 진행 메시지는 stderr로 → stdout에는 HTML만
+    with contextlib.redirect_stdout(sys.stderr):
+        md_path = resolve_md_path(args.file)
+        if not md_path:
+            return 1
+        title, body, _ = parse_markdown(str(md_path))
+        print(f"📝 제목: {title}")
+
+    if args.out:
+        Path(args.out).write_text(body, encoding="utf-8")
+        print(f"💾 저장: {args.out}", file=sys.stderr)
     else:
-        md_path = get_latest_md()
+        print(body)
+    return 0
+
+
+def cmd_preflight(args) -> int:
+    """브라우저 없이 이미지 push 여부만 점검"""
+    md_path = resolve_md_path(args.file)
+    if not md_path:
+        return 1
+    problems = preflight_images(md_path.read_text(encoding="utf-8"))
+    for name, why in problems:
+        print(f"  ❌ {name}: {why}")
+    if problems:
+        return 1
+    print("✅ 이미지 점검 통과")
+    return 0
+
+
+def cmd_check_session(args) -> int:
+    import asyncio
+
+    if not require_session():
+        return 1
+    try:
+        ok = asyncio.run(check_session())
+    except ImportError as e:
+        print(e)
+        return 1
+    if ok:
+        print("✅ 세션 유효")
+        return 0
+    print("⚠️  세션이 만료되었습니다. tistory_login.py 를 다시 실행해주세요.")
+    return 1
+
+
+def cmd_publish(args) -> int:
+    import asyncio
+
+    def emit(result: dict) -> int:
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False), file=sys.__stdout__)
+        elif result["cancelled"]:
+            print("취소됨")
+        elif result["ok"]:
+            steps = ", ".join(f"{k} {v:.1f}s" for k, v in result["timings"].items())
+            print(f"⏱️  {steps}")
+        else:
+            print(result["error"])
+        return 0 if result["ok"] or result["cancelled"] else 1
+
+    # --json: stdout에는 결과 JSON 한 줄만, 진행 메시지는 stderr
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        if not args.no_pull:
+            git_pull()
+
+        md_path = resolve_md_path(args.file)
         if not md_path:
-            print("❌ posts/ 폴더에 md 파일이 없습니다.")
-            return
-        print(f"📂 최신 파일 자동 선택: {md_path.name}")
+            result = new_result(args.file, args.draft, args.mode, args.images)
+            result["error"] = "❌ 파일 없음"
+            return emit(result)
+        print(f"📄 파일: {md_path.name}")
 
-    print(f"📄 파일: {md_path.name}")
-    title, body = parse_markdown(str(md_path))
-    print(f"📝 제목: {title}")
-    print(f"🚀 모드: {'임시저장' if args.draft else '발행'}")
+        def ask(title: str) -> bool:
+            print(f"📝 제목: {title}")
+            print(f"🚀 모드: {'임시저장' if args.draft else '발행'} ({args.mode or 'front matter'})")
+            try:
+                return input("\n진행할까요? (y/n): ").strip().lower() == "y"
+            except EOFError:
+                return False
 
-    confirm = input("\n진행할까요? (y/n): ").strip().lower()
-    if confirm != "y":
-        print("취소됨")
-        return
+        confirm = None if (args.yes or args.json) else ask
+        result = asyncio.run(publish(md_path, draft=args.draft, mode=args.mode, images=args.images,
+                                     preflight=not args.no_preflight, confirm=confirm))
+        return emit(result)
 
-    asyncio.run(post_to_tistory(title, body, draft=args.draft))
+
+COMMANDS = ("render", "preflight", "check-session", "publish")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="티스토리 자동 배포")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("publish", help="발행 (기본값)")
+    p.add_argument("--file",    default=None, help="마크다운 파일 경로")
+    p.add_argument("--draft",   action="store_true", help="임시저장 (발행 안함)")
+    p.add_argument("--no-pull", action="store_true", help="git pull 생략")
+    p.add_argument("--mode",    default=None, choices=list(VISIBILITY_INPUTS),
+                   help="공개 설정 (생략 시 front matter visibility, 없으면 public)")
+    p.add_argument("--yes", "-y", action="store_true", help="확인 없이 바로 진행")
+    p.add_argument("--json",    action="store_true", help="결과를 JSON 한 줄로 출력 (확인 생략)")
+    p.add_argument("--no-preflight", action="store_true", help="이미지 push 여부 점검 생략")
+    p.add_argument("--base-url", default=None, help="테스트용 티스토리 주소 (fake_tistory_server.py)")
+    p.add_argument("--images",  default="github", choices=IMAGE_MODES,
+                   help="이미지 방식: github (raw URL) / upload (티스토리 첨부 업로드)")
+    p.set_defaults(func=cmd_publish)
+
+    p = sub.add_parser("render", help="HTML 변환만 (브라우저 실행 안 함)")
+    p.add_argument("--file", default=None, help="마크다운 파일 경로")
+    p.add_argument("--out",  default=None, help="HTML 저장 경로 (생략 시 stdout)")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("preflight", help="이미지가 원격 브랜치에 push 됐는지 점검")
+    p.add_argument("--file", default=None, help="마크다운 파일 경로")
+    p.set_defaults(func=cmd_preflight)
+
+    p = sub.add_parser("check-session", help="세션 유효성 확인")
+    p.add_argument("--base-url", default=None, help="테스트용 티스토리 주소 (fake_tistory_server.py)")
+    p.set_defaults(func=cmd_check_session)
+    return parser
+
+
+def force_utf8_stdio():
+    """터미널 인코딩 강제 UTF-8 (CLI 진입점에서만 호출)"""
+    for stream in (sys.stdout, sys.stderr, sys.stdin):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8")
+
+
+def main(argv=None) -> int:
+    force_utf8_stdio()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # 서브커맨드 생략 시 publish (기존 `--file ...` 호출 호환)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv.insert(0, "publish")
+    args = build_parser().parse_args(argv)
+    if getattr(args, "base_url", None):
+        CONFIG["base_url"] = args.base_url
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
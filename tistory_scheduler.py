@@ -0,0 +1,233 @@
+"""
+티스토리 예약 발행 데몬
+========================
+posts/*.md 앞머리(front matter)에 publish_at 이 있는 글을 그 시각에 발행합니다.
+
+  ---
+  publish_at: 2026-10-21 09:00        # 시간대 생략 시 이 컴퓨터의 로컬 시간
+  ---
+  # 글 제목
+
+동작:
+  - 예약 작업은 최소 힙(시각 순)에 보관하고, 가장 가까운 작업 시각까지만 잠듦 (폴링 없음)
+  - 블로그별 최소 발행 간격(--min-interval)으로 밤새 쌓인 글이 한꺼번에 나가지 않게 분산
+  - 브라우저는 미리 띄워 로그인 확인까지 끝내 두고(pre-warm), 발행 --lead 초 전에 글쓰기/본문 입력/
+    공개 설정까지 마친 뒤 정각에 발행 버튼만 클릭
+  - 브라우저는 계속 켜두되, --max-jobs 건마다 컨텍스트를 새로 만들고 메모리가 --max-mb 를 넘으면 재시작
+    (발행마다 탭/브라우저 메모리를 로그에 남김)
+  - 발행된 글은 발행 기록(tistory_ledger.json)에 남아 다시 발행되지 않음
+
+사용법:
+  python tistory_scheduler.py                         # 데몬 실행
+  python tistory_scheduler.py --list                  # 예약 목록만 출력
+  python tistory_scheduler.py --min-interval 600 --lead 90 --pull
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import tistory_playwright as tp
+
+POSTS_DIR = Path(__file__).parent / "posts"
+
+DEFAULT_LEAD = 60            # 정각 몇 초 전에 글쓰기 화면 준비를 시작할지
+DEFAULT_MIN_INTERVAL = 300   # 같은 블로그 발행 사이 최소 간격 (초)
+DEFAULT_RESCAN = 60          # posts/ 재검색 주기 (초)
+
+
+def parse_publish_at(value: str) -> Optional[float]:
+    """publish_at 값 → epoch 초 (형식 오류면 None)"""
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        return None
+
+
+def fmt(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%m-%d %H:%M:%S")
+
+
+def file_mtime(path: Path) -> Optional[float]:
+    """파일 mtime (삭제됐으면 None)"""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def scan_pending() -> dict:
+    """발행 기록에 없고 publish_at 이 있는 글 → {경로: 예약 시각}
+    각 파일은 front matter 만 읽음"""
+    ledger = tp.load_ledger()
+    pending = {}
+    for md in sorted(POSTS_DIR.glob("*.md")):
+        value = tp.read_front_matter(md).get("publish_at")
+        if not value or tp.ledger_key(md) in ledger:
+            continue
+        due = parse_publish_at(value)
+        if due is None:
+            print(f"  ⚠️  publish_at 형식 오류 ({md.name}): {value}")
+            continue
+        pending[md] = due
+    return pending
+
+
+class Scheduler:
+    """예약 작업 힙: (실행 시각, 순번, 종류, 경로)
+    종류 "rescan" = posts/ 재검색, "start" = 정각 lead 초 전 발행 준비 시작"""
+
+    def __init__(self, lead: float, min_interval: float, rescan: float, pull: bool,
+                 browser: tp.BrowserPool):
+        self.lead = lead
+        self.min_interval = min_interval
+        self.rescan_interval = rescan
+        self.pull = pull
+        self.heap = []
+        self.seq = itertools.count()
+        self.scheduled = {}      # 경로 → 예약 시각 (힙에 올라간 글)
+        self.start_at = {}       # 경로 → 유효한 "start" 항목 시각 (다르면 예약 변경 전 항목 → 버림)
+        self.running = set()     # 발행 진행 중인 경로
+        self.failed = {}         # 경로 → 실패 당시 mtime (파일이 바뀌기 전까지 재시도 안 함)
+        self.done = set()        # 이번 실행에서 발행을 마친 경로 (발행 기록을 안 남기는 --base-url 테스트에서도 재발행 방지)
+        self.next_slot = {}      # 블로그 → 다음 발행 가능 시각
+        self.browser = browser       # 미리 띄워둔 브라우저 (탭 수/메모리 관리 포함)
+        self.tasks = set()
+
+    def push(self, at: float, kind: str, path: Optional[Path] = None):
+        heapq.heappush(self.heap, (at, next(self.seq), kind, path))
+
+    def rescan(self):
+        if self.pull:
+            tp.git_pull()
+        pending = scan_pending()
+        # publish_at 이 지워졌거나 파일이 삭제된 글은 예약 취소 (힙 항목은 start_at 이 없으니 꺼낼 때 버려짐)
+        for path in [p for p in self.scheduled if p not in pending and p not in self.running]:
+            del self.scheduled[path]
+            self.start_at.pop(path, None)
+            print(f"🗑️  예약 취소: {path.name}")
+        for path in [p for p in self.failed if p not in pending]:
+            del self.failed[path]
+
+        for path, due in pending.items():
+            if path in self.done or path in self.running or self.scheduled.get(path) == due:
+                continue
+            if path in self.failed and self.failed[path] == file_mtime(path):
+                continue
+            self.failed.pop(path, None)
+            # 시각이 바뀐 글은 새로 예약 (이전 힙 항목은 꺼낼 때 start_at 과 비교해서 버림)
+            self.scheduled[path] = due
+            self.start_at[path] = due - self.lead
+            self.push(due - self.lead, "start", path)
+            print(f"🗓️  예약: {path.name} → {fmt(due)}")
+
+    def start_job(self, path: Path):
+        """블로그별 발행 간격을 지켜 실제 발행 시각(slot)을 정하고 준비 시작
+        이미 지난 글(밤새 쌓인 글, 데몬 재시작)도 지금 시각 기준으로 간격을 두고 하나씩 발행"""
+        blog = tp.blog_url()
+        slot = max(self.scheduled[path], self.next_slot.get(blog, 0.0), time.time())
+        if slot - self.lead > time.time():
+            # 발행 간격 때문에 밀린 글 → 밀린 시각 기준으로 다시 대기
+            self.start_at[path] = slot - self.lead
+            self.push(slot - self.lead, "start", path)
+            return
+        self.next_slot[blog] = slot + self.min_interval
+        self.start_at.pop(path, None)
+        self.running.add(path)
+        task = asyncio.create_task(self.run_job(path, slot))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run_job(self, path: Path, slot: float):
+        async def until_slot():
+            await asyncio.sleep(max(0.0, slot - time.time()))
+
+        try:
+            await self.browser.warm()
+            print(f"🚀 발행 준비: {path.name} (정각 {fmt(slot)})")
+            result = await tp.publish(path, pool=self.browser, before_submit=until_slot)
+            if result["ok"]:
+                self.done.add(path)
+                late = time.time() - slot
+                print(f"🎉 예약 발행 완료: {path.name} → {result['url']} "
+                      f"(정각 대비 +{late:.2f}s, {result['timings']})")
+            else:
+                print(f"❌ 예약 발행 실패: {path.name}: {result['error']}")
+                self.failed[path] = file_mtime(path)
+        except Exception as e:
+            print(f"❌ 예약 발행 실패: {path.name}: {e}")
+            self.failed[path] = file_mtime(path)
+        finally:
+            self.running.discard(path)
+            self.scheduled.pop(path, None)
+
+    async def run(self):
+        self.push(time.time(), "rescan")
+        try:
+            while self.heap:
+                at, _, kind, path = self.heap[0]
+                delay = at - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                heapq.heappop(self.heap)
+
+                if kind == "rescan":
+                    self.rescan()
+                    self.push(time.time() + self.rescan_interval, "rescan")
+                elif kind == "start" and self.start_at.get(path) == at:
+                    self.start_job(path)
+        finally:
+            for task in list(self.tasks):
+                await task
+            await self.browser.close()
+
+
+def main():
+    tp.force_utf8_stdio()
+    parser = argparse.ArgumentParser(description="티스토리 예약 발행 데몬")
+    parser.add_argument("--lead",         type=float, default=DEFAULT_LEAD, help="발행 준비 시작 (정각 몇 초 전)")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL, help="블로그별 최소 발행 간격 (초)")
+    parser.add_argument("--rescan",       type=float, default=DEFAULT_RESCAN, help="posts/ 재검색 주기 (초)")
+    parser.add_argument("--pull",         action="store_true", help="재검색 때마다 git pull")
+    parser.add_argument("--base-url",     default=None, help="테스트용 티스토리 주소 (fake_tistory_server.py)")
+    parser.add_argument("--max-pages",    type=int, default=tp.BROWSER_MAX_PAGES, help="동시에 여는 발행 탭 수")
+    parser.add_argument("--max-jobs",     type=int, default=tp.BROWSER_MAX_JOBS,
+                        help="이 건수만큼 발행하면 브라우저 컨텍스트 재생성 (0 = 안 함)")
+    parser.add_argument("--max-mb",       type=float, default=tp.BROWSER_MAX_MB,
+                        help="브라우저 메모리(MB)가 이보다 크면 브라우저 재시작 (0 = 안 함)")
+    parser.add_argument("--list",         action="store_true", help="예약 목록만 출력하고 종료")
+    args = parser.parse_args()
+
+    if args.base_url:
+        tp.CONFIG["base_url"] = args.base_url
+
+    if args.list:
+        pending = scan_pending()
+        for path, due in sorted(pending.items(), key=lambda kv: kv[1]):
+            print(f"{fmt(due)}  {path.name}")
+        if not pending:
+            print("예약된 글 없음")
+        return
+
+    if not tp.require_session():
+        sys.exit(1)
+
+    print(f"⏰ 예약 발행 데몬 시작 (준비 {args.lead:.0f}s 전, 간격 {args.min_interval:.0f}s, "
+          f"재검색 {args.rescan:.0f}s)")
+    browser = tp.BrowserPool(max_pages=args.max_pages, max_jobs=args.max_jobs, max_mb=args.max_mb)
+    scheduler = Scheduler(args.lead, args.min_interval, args.rescan, args.pull, browser)
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        print("\n👋 종료")
+
+
+if __name__ == "__main__":
+    main()